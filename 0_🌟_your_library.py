@@ -1,73 +1,68 @@
 import os
 import streamlit as st
-import requests
 import json
-import pandas as pd
 from dotenv import load_dotenv
-import plotly.graph_objs as go
-import base64
-import re
-
-def create_individual_politicians_dict(members):
-    individual_politicians = {}
-    for member in members:
-        unique_id = generate_unique_id(member)  # Assuming this function is compatible
-        first_name, last_name = member['name'].split()[:2]
-        individual_politicians[unique_id] = {
-            'First Name': first_name,
-            'Last Name': last_name,
-            'Electorate': member.get('electorate', 'N/A'),
-            'Party': member['party'],
-            'Effective Party': member.get('effective_party', member['party']),  # Use 'party' as a fallback
-            'Color': member.get('color', 'gray'),  # Default to gray if color is not provided
-            'Vote': 'Absent'
-        }
-    return individual_politicians
-
-def update_votes(individual_politicians, votes):
-    for vote_entry in votes:
-        if 'member' not in vote_entry or ('name' not in vote_entry['member'] and ('first_name' not in vote_entry['member'] or 'last_name' not in vote_entry['member'])):
-            st.write(f"Skipping invalid vote_entry: {vote_entry}")
-            continue
 
-        unique_id = generate_unique_id(vote_entry['member'])
-        individual_politicians.get(unique_id, {}).update({
-            'Vote': 'Yes' if vote_entry['vote'] == 'aye' else 'No'
-        })
+# pandas and plotly are imported where they're first needed, so the header renders before them
+from scripts.build_assets import SOURCE_FILENAME, header_background_css, header_variants_available
+from scripts.division_categories import CATEGORIES, classify_division
+from scripts.memo import MEMO, memoize
+
+@st.cache_resource(max_entries=1)
+def load_parliament_data(version):
+    # Loaded once per process and data version; every session reads the same read-only object.
+    # Only the current version is kept, so a refresh releases the old memmaps, catalog and tables
+    from scripts.parliament_data import ParliamentData
+    return ParliamentData(version)
+
+# Dictionary to classify parties as major vs minor/independent
+party_dict = {
+    'major_parties': {
+        'senate': ['Australian Labor Party', 'Liberal National Party', 'Australian Greens'],
+        'representatives': ['Australian Labor Party', 'Liberal National Party', 'Australian Greens']
+    },
+    'minor_independents': {
+        'senate': ['Lidia Thorpe', 'Jacqui Lambie Network', 'United Australia Party', 'David Pocock', 'Pauline Hanson\'s One Nation Party'],
+        'representatives': ['Rebekha Sharkie', 'Kate Chaney', 'Zoe Daniel', 'Andrew Gee', 'Helen Haines', 'Dai Le', 'Monique Ryan', 'Sophie Scamps', 'Allegra Spender', 'Zali Steggall', 'Andrew Wilkie', 'Bob Katter']
+    },
+    'all_members': {
+        'senate': [],  # will populate this below
+        'representatives': []  # will populate this below
+    }
+}
+party_dict['all_members']['senate'] = party_dict['major_parties']['senate'] + party_dict['minor_independents']['senate']
+party_dict['all_members']['representatives'] = party_dict['major_parties']['representatives'] + party_dict['minor_independents']['representatives']
 
-@st.cache_data()
-def format_division_data(division_data):
+# The per-division functions below are memoized by (view, division id, ...) and the data version
+# in scripts/memo.py rather than st.cache_data, so building a key never hashes a whole division
+
+@memoize('division')
+def return_division(division_id, version):
+    return load_parliament_data(version).division(division_id)
+
+@memoize('members')
+def format_division_data(division_id, version):
+    import pandas as pd
+    from scripts.members import division_vote_table
+
+    division_data = return_division(division_id, version=version)
     if not division_data:
         st.write("Empty division_data")
         return pd.DataFrame()
 
     house = division_data.get('house', 'N/A')
 
-    members = st.session_state.get(house, [])  # Safely get the members data
+    member_table = load_parliament_data(version).member_table(house)
 
-    if not members:
+    if member_table is None:
         st.write("No members data to process")
         return pd.DataFrame()
 
-    individual_politicians = create_individual_politicians_dict(members)
-
-    update_votes(individual_politicians, division_data.get('votes', []))
-
-    individual_politicians_df = pd.DataFrame(list(individual_politicians.values()))
-
-    
-
-    # Special update for Independent senators.
-    condition = individual_politicians_df['Effective Party'] == 'Independent'
-    individual_politicians_df.loc[condition, 'Effective Party'] = individual_politicians_df.loc[condition, 'First Name'] + ' ' + individual_politicians_df.loc[condition, 'Last Name']
-
-    # Handle any NaN values.
-    individual_politicians_df['Effective Party'].fillna('Unknown', inplace=True)
-
-    return individual_politicians_df
+    # Vectorised join of the division's votes onto the member table by id
+    return division_vote_table(member_table, division_data)
 
 def plot_parliament(individual_votes, active_division):
-    
+    import plotly.graph_objs as go
 
 
     fig = go.Figure(data=go.Scatter(
@@ -134,34 +129,11 @@ def load_vote_template(filename):
         st.write("No local member data found.")
         return None
 
-@st.cache_data()
-def load_members_from_files(filename):
-    # Check if the file with all members exists
-    if os.path.exists(filename):
-        # Load data from the file if it exists
-        with open(filename, 'r') as f:
-            return json.load(f)
-    else:
-        st.write("No local member data found.")
-        return None
-
-@st.cache_data()
-def load_divisions_from_files():
-    # Define the directory and filename
-    directory = './data/parliament'
-    filename = f"{directory}/divisions.json"
-    
-    # Check if the file with all divisions exists
-    if os.path.exists(filename):
-        # Load data from the file if it exists
-        with open(filename, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    else:
-        st.write("No local division data found.")
-        return None
+def plotly_vote_breakdown(party_votes, visible_parties):
+    import plotly.graph_objs as go
+    from scripts.vote_breakdown import REQUIRED_YES_VOTES
 
-@st.cache_data()
-def plotly_vote_breakdown(individual_votes, visible_parties):
+    # party_votes is the party x vote type table from aggregate_votes, computed once per division
     # For coloring data visualisations
     party_color_map = {
         'Australian Greens': '#009C3D',
@@ -174,99 +146,35 @@ def plotly_vote_breakdown(individual_votes, visible_parties):
         'United Australia Party': '#ffed00' # todo - add more
     }
 
-    # Get unique parties from the DataFrame
-    unique_parties = individual_votes['Effective Party'].unique()
+    vote_types = list(party_votes.columns)
+    counts = party_votes.to_numpy()
 
-    # Group by 'Effective Party' and 'Vote' and then count the number of occurrences
-    effective_party_vote_df = individual_votes.groupby(['Effective Party', 'Vote']).size().unstack(fill_value=0)
+    # Largest stack: the total for the most common vote type
+    max_vote = int(counts.sum(axis=0).max()) if counts.size else 0
 
-    # Calculate total votes per effective party
-    effective_party_vote_df['Total_Votes'] = effective_party_vote_df.sum(axis=1)
-
-    # Initialize an empty dictionary to store aggregated voting data
-    aggregated_votes = {}
-
-    # Aggregate the data from individual_votes
-    for _, row in individual_votes.iterrows():
-        party = row['Effective Party']
-        vote = row['Vote']
-        
-        if party not in aggregated_votes:
-            aggregated_votes[party] = {'Yes': 0, 'No': 0, 'Absent': 0}
-            
-        if vote == 'Yes':
-            aggregated_votes[party]['Yes'] += 1
-        elif vote == 'No':
-            aggregated_votes[party]['No'] += 1
-        else:  # Absent
-            aggregated_votes[party]['Absent'] += 1
-
-    # Instantiate bars
-    vote_types = ['Yes', 'No', 'Absent']
+    # One stacked trace per party, skipping vote types the party has no votes in
     bars = []
-    unique_parties = set()  # To keep track of unique parties for legend
-    max_vote = 0  # To keep track of the maximum vote
-
-    for vote_type in vote_types:
-        for effective_party in effective_party_vote_df.index:
-            # Sum all votes of this type across all parties
-            sum_votes = effective_party_vote_df[vote_type].sum()
-            
-            # Update max_vote
-            max_vote = max(max_vote, sum_votes)
-
-            count = effective_party_vote_df.loc[effective_party, vote_type]
-            if count == 0:
-                continue  # Skip if count is zero
-
-
-            # Show legend based on whether the effective party has been added yet
-            if effective_party not in unique_parties:
-                showlegend = True
-                unique_parties.add(effective_party)  # Mark the effective party as added
-            else:
-                showlegend = False
-
-
-            # Set color based on whether the effective_party is in visible_parties
-            color = party_color_map.get(effective_party, 'gray') if effective_party in visible_parties else 'gray'
-
-            legend_name = f"{effective_party}"
-
-            bars.append(
-                go.Bar(
-                    name=legend_name,
-                    showlegend=showlegend,
-                    x=[vote_type],
-                    y=[count],
-                    marker=dict(color=color),
-                    hoverinfo='y+name',
-                    hoverlabel=dict(namelength=-1),
-                    legendgroup=effective_party
-                )
+    for effective_party, party_counts in zip(party_votes.index, counts):
+        nonzero = party_counts > 0
+
+        # Set color based on whether the effective_party is in visible_parties
+        color = party_color_map.get(effective_party, 'gray') if effective_party in visible_parties else 'gray'
+
+        bars.append(
+            go.Bar(
+                name=f"{effective_party}",
+                x=[vote_type for vote_type, shown in zip(vote_types, nonzero) if shown],
+                y=party_counts[nonzero],
+                marker=dict(color=color),
+                hoverinfo='y+name',
+                hoverlabel=dict(namelength=-1),
+                legendgroup=effective_party
             )
-
-            unique_parties.add(effective_party)  # Mark party as added to legend
+        )
 
     # Create figure
     fig = go.Figure(data=bars)
 
-    # Add the dashed line
-    fig.add_shape(
-        go.layout.Shape(
-            type='line',
-            x0=min(vote_types),
-            x1=max(vote_types),
-            y0=39,
-            y1=39,
-            line=dict(
-                dash='dash',
-                width=4,
-                color='#FFFFFF'
-            ),
-        )
-    )
-
     # Change the y-axis upper limit
     y_axis_max = max(55, max_vote + 20)
 
@@ -289,13 +197,13 @@ def plotly_vote_breakdown(individual_votes, visible_parties):
             range=[0, y_axis_max],
             fixedrange=True
             ),
-        xaxis=dict(fixedrange=True),
+        xaxis=dict(fixedrange=True, categoryorder='array', categoryarray=vote_types),
         shapes=[
             dict(
                 type='line',
                 yref='y',
-                y0=39,
-                y1=39,
+                y0=REQUIRED_YES_VOTES,
+                y1=REQUIRED_YES_VOTES,
                 xref='paper',
                 x0=0,
                 x1=1,
@@ -305,7 +213,7 @@ def plotly_vote_breakdown(individual_votes, visible_parties):
         annotations=[
             dict(
                 x=0.1,
-                y=42,
+                y=REQUIRED_YES_VOTES + 3,
                 xref='paper',
                 yref='y',
                 text='required Yes votes to pass',
@@ -318,93 +226,49 @@ def plotly_vote_breakdown(individual_votes, visible_parties):
     # Return fig object
     return fig
 
-def generate_unique_id(member):
-    first_name = member.get('first_name') or member.get('name').split()[0]
-    last_name = member.get('last_name') or member.get('name').split()[1]
-    party = member.get('party', 'Unknown')
-    return f"{first_name}_{last_name}_{party}"
-
 def categorise_divisions(division_names):
-    categories = {
-        'Matters of Urgency': [],
-        'Business': [],
-        'Documents': [],
-        'Committees': [],
-        'Motions': [],
-        'Bills': {},
-        'Budget': [],
-        'Regulations and Determinations': [],
-        'Statements': []
-    }
-    
-    # Regular expression patterns for different division formats
-    bill_pattern = re.compile(r"^(Bills? —? .+? \d{4})[;,]?( in Committee - | - |;)?(.*)")
-    budget_pattern = re.compile(r"^(Budget) - (.+) - (.+)")
-    reg_det_pattern = re.compile(r"^(Regulations and Determinations) - (.+?) - (.+)")
-    statement_pattern = re.compile(r"^(Statements) — (.+)")
+    categories = {category: {} if category == 'Bills' else [] for category in CATEGORIES}
 
     for division in division_names:
-        # Initialize a flag to indicate if the current division has been categorized
-        categorized = False
-
-        # Check against known categories other than 'Bills', 'Budget', 'Regulations and Determinations', 'Statements'
-        for category in ['Matters of Urgency', 'Business', 'Documents', 'Committees', 'Motions']:
-            if division.startswith(category):
-                # If a known category is found, strip out the category and " - " to get the clean name
-                clean_name = division[len(category) + 3:]  # Skip past category and " - "
-                categories[category].append(clean_name)
-                categorized = True
-                break  # Exit the loop after categorizing
-
-        # Handle budget-related divisions
-        if not categorized:
-            match = budget_pattern.match(division)
-            if match:
-                categories['Budget'].append(match.group(2).strip() + " - " + match.group(3).strip())
-                categorized = True
-
-        # Handle regulations and determinations
-        if not categorized:
-            match = reg_det_pattern.match(division)
-            if match:
-                categories['Regulations and Determinations'].append(match.group(2).strip() + " - " + match.group(3).strip())
-                categorized = True
-
-        # Handle statements
-        if not categorized:
-            match = statement_pattern.match(division)
-            if match:
-                categories['Statements'].append(match.group(2).strip())
-                categorized = True
-
-        # If division is not categorized yet, it may be a Bill
-        if not categorized:
-            match = bill_pattern.match(division)
-            if match:
-                # Extract the bill name (including year) and division stage
-                bill_name = match.group(1).strip()
-                division_stage = match.group(3).strip() if match.group(3) else "General"
-                categories['Bills'].setdefault(bill_name, []).append(division_stage)
-            else:
-                # Log or handle unrecognized division formats if necessary
-                print(f"Unrecognized division format: {division}")
+        classified = classify_division(division)
+        if classified is None:
+            # Log or handle unrecognized division formats if necessary
+            print(f"Unrecognized division format: {division}")
+            continue
+
+        category, bill_name, label = classified
+        if category == 'Bills':
+            categories['Bills'].setdefault(bill_name, []).append(label)
+        else:
+            categories[category].append(label)
 
     return categories
 
-@st.cache_data()
-def return_division(full_name, divisions):
-    division = next(
-        (division for division in divisions.values() if division['name'] == full_name), None)
-    return division
+@memoize('party_votes')
+def division_party_votes(division_id, version):
+    # A lookup in the precomputed breakdowns, or tallied here for a division that isn't in them
+    # yet. All three views are built from the same table.
+    party_votes = load_parliament_data(version).party_votes(division_id)
+    if party_votes is None:
+        from scripts.vote_breakdown import aggregate_votes
+        party_votes = aggregate_votes(format_division_data(division_id, version=version))
+    return party_votes
+
+@memoize('figure')
+def division_figure(division_id, house, view, version):
+    return plotly_vote_breakdown(division_party_votes(division_id, version=version), party_dict[view][house])
 
-@st.cache_data()
 def background_image(content1, content2):
-    with open("static/img/Parliament-House-Australia-Thennicke.jpg", "rb") as image_file:
-        image_data = base64.b64encode(image_file.read()).decode()
-    
-    background_image_html = f'url(data:image/png;base64,{image_data})'
+    # The photo is served as a static file (pre-sized variants from scripts/build_assets.py), so
+    # each page only carries this small block of HTML and browsers cache the image itself
+    if header_variants_available():
+        background_css = header_background_css('.parliament-header')
+    else:
+        background_css = f".parliament-header {{ background-image: url(app/{os.path.relpath(SOURCE_FILENAME)}); }}"
+
     st.markdown(
-        f'<h1 style="text-align:center;background-image: {background_image_html};background-size: 100% 100%;'
+        f'<style>{background_css}</style>'
+        f'<h1 class="parliament-header" style="text-align:center;background-size: 100% 100%;'
         f'font-size:60px;border-radius:2%;padding-top:35%;padding-bottom:10%;">'  
         f'<span style="background-color: rgb(69,69,92,0.5); color:white;font-size:40px;">{content1}</span><br>'
         f'<span style="background-color: rgb(69,69,92,0.6); color:white;font-size:19px;">{content2}</span></h1>',
@@ -433,95 +297,80 @@ def main():
         initial_sidebar_state="collapsed",
         layout="centered")
     
-    # Set initial state
-    keys = ['divisions', 'senate', 'representatives', 'selected_division']
-    default_values = [None, None, None, None]
+    # Set initial state: sessions only hold their selection; the data itself is shared
+    keys = ['selected_division_id']
+    default_values = [None]
 
     for key, default_value in zip(keys, default_values):
         if key not in st.session_state:
             st.session_state[key] = default_value
 
-    
-    
-    st.session_state['representatives'] = load_members_from_files('./data/parliament/house.json')
-    st.session_state['senate'] = load_members_from_files('./data/parliament/senate.json')
-    st.session_state['divisions'] = load_divisions_from_files()
-    #st.write(type(st.session_state['divisions']))
-    #st.write(sum(1 for item in st.session_state['divisions'].values() if item['house'] == 'senate'))
-
-    # Header
+    # Header, drawn before any data is loaded
     background_image("window into parliament", "a tool to clearly display the proceedings of government")
     st.write()
 
+    from scripts.parliament_data import data_version
+    version = data_version()
+    data = load_parliament_data(version)
+    catalog = data.catalog
+
     #st.markdown(photo_html, unsafe_allow_html=True)
     
     
-    if st.session_state['divisions'] is None or st.session_state['senate'] is None or st.session_state['representatives'] is None:
+    if not data.loaded():
         st.write('data not loaded in yet')
     else:
         st.write("⬇️ select a type of 'division': a vote in either the house of representatives or the senate")
         
         col1, col2 = st.columns([0.3,0.7])
-        division_names = [division['name'] for key, division in st.session_state['divisions'].items()]
-        
-        divisions_dict = categorise_divisions(division_names)
+
+        # Pickers read the prebuilt catalog; each option label maps straight to a division id.
+        # Only the chosen category's list is ever loaded.
+        selected_division_id = None
         with col1:
-            selected_division_category =  st.radio(label='pick a type of division', options=list(divisions_dict.keys()))
+            selected_division_category =  st.radio(label='pick a type of division', options=catalog.category_names())
         
         with col2:
+            divisions_in_category = catalog.category(selected_division_category)
             if selected_division_category == 'Bills':
-                st.write(divisions_dict['Bills'])
                 # Ensure there are bill names to select from
-                if divisions_dict['Bills']:
-                    selected_bill_name = st.selectbox(label='pick a bill', options=list(divisions_dict['Bills'].keys()))
+                if divisions_in_category:
+                    selected_bill_name = st.selectbox(label='pick a bill', options=list(divisions_in_category.keys()))
                     # Display the subdivisions or stages of the selected bill
                     if selected_bill_name:  # Ensure a bill name is selected
-                        bill_stages = divisions_dict['Bills'][selected_bill_name]
+                        bill_stages = divisions_in_category[selected_bill_name]
                         if len(bill_stages) == 1:
-                            full_name = selected_bill_name + ' - ' + bill_stages[0]
+                            selected_division_id = bill_stages[0][1]
                         else:
-                            selected_bill_reading = st.selectbox(label='which division?', options=bill_stages)
-                            full_name = selected_bill_name + ' - ' + selected_bill_reading
+                            stage_ids = dict(bill_stages)
+                            selected_bill_reading = st.selectbox(label='which division?', options=list(stage_ids))
+                            selected_division_id = stage_ids[selected_bill_reading]
                 else:
                     st.write("No bills available for selection.")
             else:
                 # Ensure there are divisions to select from within the chosen category
-                if divisions_dict[selected_division_category]:  # Check for non-empty category
-                    selected_division = st.selectbox(label='pick a division', options=divisions_dict[selected_division_category])
-                    full_name = selected_division_category + ' - ' + selected_division
+                if divisions_in_category:  # Check for non-empty category
+                    division_ids = dict(divisions_in_category)
+                    selected_division_label = st.selectbox(label='pick a division', options=list(division_ids))
+                    selected_division_id = division_ids[selected_division_label]
                 else:
                     st.write(f"No divisions available for {selected_division_category} category.")
 
+        if selected_division_id is None:
+            return
         
-        # Hold selected division in session state
-        st.session_state['selected_division'] = return_division(full_name, st.session_state['divisions'])
+        # Hold the selected division's id in session state
+        st.session_state['selected_division_id'] = selected_division_id
+        selected_division = return_division(selected_division_id, version=version)
         
-        individual_votes = format_division_data(st.session_state['selected_division'])
-
-        # Dictionary to classify parties as major vs minor/independent
-        party_dict = {
-            'major_parties': {
-                'senate': ['Australian Labor Party', 'Liberal National Party', 'Australian Greens'],
-                'representatives': ['Australian Labor Party', 'Liberal National Party', 'Australian Greens']
-            },
-            'minor_independents': {
-                'senate': ['Lidia Thorpe', 'Jacqui Lambie Network', 'United Australia Party', 'David Pocock', 'Pauline Hanson\'s One Nation Party'],
-                'representatives': ['Rebekha Sharkie', 'Kate Chaney', 'Zoe Daniel', 'Andrew Gee', 'Helen Haines', 'Dai Le', 'Monique Ryan', 'Sophie Scamps', 'Allegra Spender', 'Zali Steggall', 'Andrew Wilkie', 'Bob Katter']
-            },
-            'all_members': {
-                'senate': [],  # will populate this below
-                'representatives': []  # will populate this below
-            }
-        }
-        party_dict['all_members']['senate'] = party_dict['major_parties']['senate'] + party_dict['minor_independents']['senate']
-        party_dict['all_members']['representatives'] = party_dict['major_parties']['representatives'] + party_dict['minor_independents']['representatives']
-
-        selected_house = st.session_state['selected_division']['house']
+        individual_votes = format_division_data(selected_division_id, version=version)
+
+        selected_house = selected_division['house']
 
         # Generate figures 
-        fig_major = plotly_vote_breakdown(individual_votes, party_dict['major_parties'][selected_house])
-        fig_minor = plotly_vote_breakdown(individual_votes, party_dict['minor_independents'][selected_house])
-        fig_all = plotly_vote_breakdown(individual_votes, party_dict['all_members'][selected_house])
+        fig_major = division_figure(selected_division_id, selected_house, 'major_parties', version=version)
+        fig_minor = division_figure(selected_division_id, selected_house, 'minor_independents', version=version)
+        fig_all = division_figure(selected_division_id, selected_house, 'all_members', version=version)
 
         # Display figures
         major_parties, minor_independents, all_members = st.tabs(['major parties', 'minor parties & independents', 'all members'])
@@ -529,25 +378,29 @@ def main():
             #st.markdown(
             #    f'<h1 style="text-align:center;background-image: {background_image_html};background-size: 100% 100%;'
             #    f'font-size:60px;border-radius:2%;padding-top:35%;padding-bottom:10%;">'  
-            #    f'<span style="background-color: rgb(69,69,92,0.6); color:white;font-size:19px;">{st.session_state['selected_division']['name']}#</span></h1>',
+            #    f'<span style="background-color: rgb(69,69,92,0.6); color:white;font-size:19px;">{selected_division['name']}#</span></h1>',
             #    unsafe_allow_html=True
 
 
             #)
-            st.subheader(st.session_state['selected_division']['name'])
+            st.subheader(selected_division['name'])
             st.plotly_chart(fig_major, use_container_width=True)
         with minor_independents:
-            st.subheader(st.session_state['selected_division']['name'])
+            st.subheader(selected_division['name'])
             st.plotly_chart(fig_minor, use_container_width=True)
         with all_members:
-            st.subheader(st.session_state['selected_division']['name'])
+            st.subheader(selected_division['name'])
             st.plotly_chart(fig_all, use_container_width=True)
         
         with st.expander("individual member votes"):
             st.dataframe(individual_votes, use_container_width=True, hide_index=True)
 
-        st.markdown(st.session_state['selected_division']['summary'])
+        st.markdown(selected_division['summary'])
         st.divider()
+
+        if os.getenv('SHOW_CACHE_STATS'):
+            with st.sidebar.expander("cache stats"):
+                st.json(MEMO.stats())
             
 
 
@@ -0,0 +1,168 @@
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime
+
+# Cold-start and rerun latency of the app, driven headlessly with Streamlit's AppTest against
+# synthetic datasets (scripts/synthetic_parliament.py) of each requested size:
+#
+#   import        executing the app module's top level (imports, decorators) in a fresh process
+#   first_render  the first run of main() in that process: data loading plus the first division
+#   warm_render   a new session's first run once the process-wide caches are warm
+#   switch        one rerun after picking another division, cycling through the picker
+#
+# Each repeat runs in its own interpreter so import and first-render times are genuinely cold.
+#   python -m benchmarks.app_benchmark --divisions 300 3000 30000 --repeats 3
+# Results go to benchmarks/results/app-<commit>.json (or --output) for comparing commits; the
+# directory is gitignored, so keep results you want to share elsewhere.
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_FILENAME = os.path.join(REPO_ROOT, '0_🌟_your_library.py')
+RESULTS_DIRECTORY = os.path.join(REPO_ROOT, 'benchmarks', 'results')
+DEFAULT_SIZES = [300, 3000]
+DEFAULT_REPEATS = 3
+DEFAULT_SWITCHES = 20
+TIMEOUT = 600
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def measure_session(switches):
+    # Runs inside the worker process, with the dataset directory as the working directory
+    import importlib.util
+
+    started = time.perf_counter()
+    spec = importlib.util.spec_from_file_location('your_library_app', APP_FILENAME)
+    spec.loader.exec_module(importlib.util.module_from_spec(spec))
+    import_seconds = time.perf_counter() - started
+
+    from streamlit.testing.v1 import AppTest
+
+    def run(app_test):
+        started = time.perf_counter()
+        app_test.run()
+        if app_test.exception:
+            raise RuntimeError(app_test.exception[0].message)
+        return time.perf_counter() - started
+
+    app_test = AppTest.from_file(APP_FILENAME, default_timeout=TIMEOUT)
+    first_render = run(app_test)
+    warm_render = run(AppTest.from_file(APP_FILENAME, default_timeout=TIMEOUT))
+
+    # Walk the picker: every category in turn, then successive divisions within one
+    switch_times = []
+    categories = list(app_test.radio[0].options)
+    while len(switch_times) < switches:
+        category = categories[len(switch_times) % len(categories)]
+        app_test.radio[0].set_value(category)
+        switch_times.append(run(app_test))
+
+        if len(switch_times) < switches and app_test.selectbox:
+            picker = app_test.selectbox[-1]
+            options = list(picker.options)
+            picker.set_value(options[len(switch_times) % len(options)])
+            switch_times.append(run(app_test))
+
+    return {
+        'import': import_seconds,
+        'first_render': first_render,
+        'warm_render': warm_render,
+        'switch': switch_times,
+    }
+
+
+def run_worker(dataset, switches):
+    command = [sys.executable, '-m', 'benchmarks.app_benchmark', '--worker', '--switches', str(switches)]
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get('PYTHONPATH')])))
+    completed = subprocess.run(command, cwd=dataset, env=environment, capture_output=True, text=True, timeout=TIMEOUT)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else 'worker failed')
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def summarise(samples):
+    return {
+        'median': statistics.median(samples),
+        'min': min(samples),
+        'max': max(samples),
+    }
+
+
+def benchmark(sizes, repeats, switches, seed=0, keep=False):
+    from scripts.synthetic_parliament import write_dataset
+
+    results = []
+    for size in sizes:
+        dataset = tempfile.mkdtemp(prefix=f'parliament-{size}-')
+        try:
+            started = time.perf_counter()
+            summary = write_dataset(dataset, size, seed=seed, static_directory=os.path.join(REPO_ROOT, 'static'))
+            generated = time.perf_counter() - started
+
+            runs = [run_worker(dataset, switches) for _ in range(repeats)]
+            result = {
+                'divisions': size,
+                'members': summary['members'],
+                'generate_seconds': generated,
+                'import': summarise([run['import'] for run in runs]),
+                'first_render': summarise([run['first_render'] for run in runs]),
+                'warm_render': summarise([run['warm_render'] for run in runs]),
+                'switch': summarise([seconds for run in runs for seconds in run['switch']]),
+                'runs': runs,
+            }
+            results.append(result)
+            print(f"{size:>7} divisions: import {result['import']['median'] * 1000:.0f} ms, "
+                  f"first render {result['first_render']['median'] * 1000:.0f} ms, "
+                  f"warm render {result['warm_render']['median'] * 1000:.0f} ms, "
+                  f"switch {result['switch']['median'] * 1000:.0f} ms (median of {repeats})")
+        finally:
+            if keep:
+                print(f"  dataset kept in {dataset}")
+            else:
+                shutil.rmtree(dataset, ignore_errors=True)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark app import, first render and rerun latency')
+    parser.add_argument('--divisions', type=int, nargs='+', default=DEFAULT_SIZES, help='dataset sizes to benchmark')
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS, help='fresh processes per size')
+    parser.add_argument('--switches', type=int, default=DEFAULT_SWITCHES, help='division switches timed per process')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='results file (default benchmarks/results/app-<commit>.json)')
+    parser.add_argument('--keep', action='store_true', help='keep the generated datasets')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure_session(args.switches)))
+        sys.exit(0)
+
+    commit = git_commit()
+    results = benchmark(args.divisions, args.repeats, args.switches, args.seed, args.keep)
+
+    output = args.output or os.path.join(RESULTS_DIRECTORY, f"app-{commit}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'commit': commit,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeats': args.repeats,
+            'switches': args.switches,
+            'results': results,
+        }, f, indent=2)
+    print(f"Results -> {output}")
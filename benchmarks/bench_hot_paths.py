@@ -0,0 +1,151 @@
+import pytest
+
+from scripts.agreement_layout import NEIGHBOURS, compute_layout
+from scripts.division_store import open_store
+from scripts.interaction_matrix import (InteractionMatrix, compute_interactions, count_interactions, interaction_filename,
+                                       save_interactions, update_interactions)
+from scripts.matrix_file import write_matrix_file
+from scripts.parliament_data import data_version
+from scripts.vote_bitsets import VoteBitsets, build_vote_bitsets
+from scripts.vote_breakdown import aggregate_votes
+from scripts.voting_blocs import compute_voting_blocs, member_directory, top_k_similar
+from scripts.vote_matrix import VoteMatrix, build_vote_matrix
+
+# Micro-benchmarks for the app's per-division hot paths and the interaction matrix computation.
+# The memoized app functions are called through __wrapped__ so every round does the real work.
+
+
+@pytest.fixture(scope='module')
+def version(app):
+    return data_version()
+
+
+@pytest.fixture(scope='module')
+def division_ids(app, version):
+    catalog = app.load_parliament_data(version).catalog
+    return [division_id for _, division_id in catalog.category('Motions')]
+
+
+@pytest.fixture(scope='module')
+def vote_matrix(dataset):
+    return VoteMatrix(build_vote_matrix(open_store()))
+
+
+@pytest.fixture(scope='module')
+def vote_bitsets(vote_matrix):
+    return VoteBitsets(build_vote_bitsets(vote_matrix))
+
+
+@pytest.fixture(scope='module')
+def senators(vote_matrix):
+    return vote_matrix.member_ids[vote_matrix.member_mask('senate')]
+
+
+@pytest.fixture(scope='module')
+def representatives_agreement(vote_matrix):
+    filename = interaction_filename('representatives')
+    save_interactions(compute_interactions(vote_matrix, 'representatives'), filename)
+    return InteractionMatrix(filename)
+
+
+@pytest.fixture(scope='module')
+def legacy_senate_agreement(vote_matrix):
+    # The Senate matrix keyed by per-term member ids, like the converted notebook matrix
+    interactions = compute_interactions(vote_matrix, 'senate')
+    filename = interaction_filename('senate_legacy')
+    write_matrix_file(filename, {'member_ids': interactions['member_ids'] + 1000000, 'rates': interactions['rates']},
+                      {'house': 'senate', 'id_kind': 'member'})
+    return InteractionMatrix(filename)
+
+
+def test_categorise_divisions(benchmark, app):
+    names = [entry['name'] for entry in open_store().read_index().values()]
+    categories = benchmark(app.categorise_divisions, names)
+    assert all(categories[category] for category in categories)
+
+
+def test_return_division(benchmark, app, version, division_ids):
+    division = benchmark(app.return_division.__wrapped__, division_ids[0], version=version)
+    assert division['id'] == division_ids[0]
+
+
+def test_format_division_data(benchmark, app, version, division_ids):
+    individual_votes = benchmark(app.format_division_data.__wrapped__, division_ids[0], version=version)
+    assert set(individual_votes['Vote']) <= {'Yes', 'No', 'Absent'}
+
+
+def test_aggregate_votes(benchmark, app, version, division_ids):
+    individual_votes = app.format_division_data(division_ids[0], version=version)
+    party_votes = benchmark(aggregate_votes, individual_votes)
+    assert party_votes.to_numpy().sum() == len(individual_votes)
+
+
+def test_party_breakdown_lookup(benchmark, app, version, division_ids):
+    data = app.load_parliament_data(version)
+    party_votes = benchmark(data.party_votes, division_ids[0])
+    assert party_votes is not None
+
+
+def test_plotly_vote_breakdown(benchmark, app, version, division_ids):
+    party_votes = app.division_party_votes(division_ids[0], version=version)
+    figure = benchmark(app.plotly_vote_breakdown, party_votes, app.party_dict['all_members']['senate'])
+    assert len(figure.data) == len(party_votes)
+
+
+def test_compute_interactions_senate(benchmark, vote_matrix):
+    interactions = benchmark(compute_interactions, vote_matrix, 'senate')
+    assert interactions['agreement'].shape[0] == len(interactions['member_ids'])
+
+
+def test_count_interactions_representatives(benchmark, vote_matrix):
+    votes = vote_matrix.votes[:, vote_matrix.division_mask('representatives')]
+    agreement, co_attendance = benchmark(count_interactions, votes)
+    assert (agreement <= co_attendance).all()
+
+
+def test_update_interactions_noop(benchmark, vote_matrix):
+    # Folding in nothing new still scans the index: the fixed cost of a scheduled update
+    store = open_store()
+    interactions = compute_interactions(vote_matrix, 'senate')
+    index = store.read_index()
+    _, added = benchmark(update_interactions, interactions, store, index)
+    assert added == 0
+
+
+def test_bitset_pairwise_agreement_subset(benchmark, vote_bitsets, senators):
+    mask = vote_bitsets.division_mask('senate', category='Bills')
+    agreement, co_attendance = benchmark(vote_bitsets.pairwise_agreement, senators[:5], mask)
+    assert (agreement <= co_attendance).all()
+
+
+def test_bitset_unanimity(benchmark, vote_bitsets, senators):
+    unanimity = benchmark(vote_bitsets.unanimity, senators[:12])
+    assert unanimity['unanimous'] <= unanimity['all_present']
+
+
+def test_bitset_split_divisions(benchmark, vote_bitsets, senators):
+    split = benchmark(vote_bitsets.split_divisions, senators, vote_bitsets.division_mask('senate'))
+    assert len(split) <= len(vote_bitsets.division_ids)
+
+
+def test_top_k_similar(benchmark, representatives_agreement):
+    member_id = int(representatives_agreement.member_ids[0])
+    similar = benchmark(top_k_similar, representatives_agreement, member_id, 10)
+    assert member_id not in [similar_id for similar_id, _, _ in similar]
+
+
+def test_member_directory_legacy_senate(benchmark, legacy_senate_agreement):
+    members = benchmark(member_directory, 'senate', legacy_senate_agreement)
+    member_id = int(legacy_senate_agreement.member_ids[0])
+    similar = top_k_similar(legacy_senate_agreement, member_id, 10)
+    assert any(similar_id in members for similar_id, _, _ in similar)
+
+
+def test_compute_voting_blocs_representatives(benchmark, representatives_agreement):
+    voting_blocs = benchmark(compute_voting_blocs, representatives_agreement)
+    assert voting_blocs['metadata']['blocs'] >= 2
+
+
+def test_compute_layout_representatives(benchmark, representatives_agreement):
+    layout = benchmark(compute_layout, representatives_agreement)
+    assert len(layout['edges']) <= NEIGHBOURS * len(layout['member_ids'])
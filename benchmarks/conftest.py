@@ -0,0 +1,82 @@
+import os
+import time
+import shutil
+import tempfile
+import statistics
+import importlib.util
+
+import pytest
+
+# Shared fixtures for the micro-benchmarks (benchmarks/bench_*.py). They aren't collected by a
+# plain `pytest` run (pip install -r requirements-dev.txt); name them explicitly:
+#   python -m pytest benchmarks/bench_hot_paths.py
+#   BENCH_DIVISIONS=20000 python -m pytest benchmarks/bench_hot_paths.py
+# With pytest-benchmark installed its `benchmark` fixture is used; otherwise a small stand-in
+# with the same call style times the functions and prints a table at the end of the run.
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_FILENAME = os.path.join(REPO_ROOT, '0_🌟_your_library.py')
+DEFAULT_DIVISIONS = 2000
+MIN_ROUNDS = 5
+MAX_TIME = 1.0
+
+results = []
+
+
+class SimpleBenchmark:
+    # The subset of pytest-benchmark's fixture the benchmarks use: benchmark(function, *args)
+    def __init__(self, name):
+        self.name = name
+
+    def __call__(self, function, *args, **kwargs):
+        value = function(*args, **kwargs)  # warm-up
+        timings = []
+        started = time.perf_counter()
+        while len(timings) < MIN_ROUNDS or time.perf_counter() - started < MAX_TIME:
+            round_started = time.perf_counter()
+            function(*args, **kwargs)
+            timings.append(time.perf_counter() - round_started)
+        results.append((self.name, len(timings), min(timings), statistics.median(timings), statistics.mean(timings)))
+        return value
+
+
+try:
+    import pytest_benchmark  # noqa: F401
+except ImportError:
+    @pytest.fixture
+    def benchmark(request):
+        return SimpleBenchmark(request.node.name)
+
+    def pytest_terminal_summary(terminalreporter):
+        if not results:
+            return
+        terminalreporter.section('benchmarks')
+        terminalreporter.write_line(f"{'name':<48} {'rounds':>7} {'min (ms)':>10} {'median (ms)':>12} {'mean (ms)':>10}")
+        for name, rounds, fastest, median, mean in results:
+            terminalreporter.write_line(f"{name:<48} {rounds:>7} {fastest * 1000:>10.3f} {median * 1000:>12.3f} {mean * 1000:>10.3f}")
+
+
+@pytest.fixture(scope='session')
+def dataset():
+    # A synthetic parliament (scripts/synthetic_parliament.py), used as the working directory
+    from scripts.synthetic_parliament import write_dataset
+
+    divisions = int(os.getenv('BENCH_DIVISIONS', DEFAULT_DIVISIONS))
+    root = tempfile.mkdtemp(prefix=f'parliament-{divisions}-')
+    previous = os.getcwd()
+    write_dataset(root, divisions, static_directory=os.path.join(REPO_ROOT, 'static'))
+    os.chdir(root)
+    try:
+        yield root
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(root, ignore_errors=True)
+
+
+@pytest.fixture(scope='session')
+def app(dataset):
+    # The app module, imported without running main()
+    spec = importlib.util.spec_from_file_location('your_library_app', APP_FILENAME)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -1,90 +1,201 @@
-import edgedb
 import os
+import sqlite3
 import streamlit as st
 import pandas as pd
 from dotenv import load_dotenv
-from itertools import groupby
-from operator import attrgetter
+from scripts import sqlite_backend
+from scripts.member_comparison import (DEFAULT_PAGE_SIZE, comparison_frame, comparison_from_votes, concat_comparisons,
+                                       empty_comparison, last_division_id)
+from scripts.query_timings import QUERY_TIMINGS, timed
 
-@st.cache_data
-def return_divisions(_client, selected_member_names, selected_division_category):
+# PARLIAMENT_BACKEND selects where the parliament schema is queried: 'edgedb' (the default, an
+# EdgeDB instance) or 'sqlite', the embedded mirror built by `python -m scripts.sqlite_backend load`
+# (PARLIAMENT_DATABASE overrides its path). Both return the same DataFrames.
+BACKENDS = ['edgedb', 'sqlite']
+
+# Categories, houses and members by party change only when the scheduled update runs
+LOOKUP_TTL = 3600
+
+
+@st.cache_resource
+def create_client(backend):
+    # One client per process, shared by every session: the EdgeDB client is a connection pool
+    # (EDGEDB_MAX_CONCURRENCY caps its size), SQLite a read-only connection usable from any thread
+    if backend == 'sqlite':
+        return sqlite_backend.connect(os.getenv("PARLIAMENT_DATABASE", sqlite_backend.DEFAULT_DATABASE))
+    import edgedb
+    max_concurrency = os.getenv("EDGEDB_MAX_CONCURRENCY")
+    return edgedb.create_client(max_concurrency=int(max_concurrency) if max_concurrency else None)
+
+
+# The member comparison is fetched a page of divisions at a time, already pivoted by the backend
+# into division ids and an int8 vote code per (division, member) (scripts/member_comparison.py)
+COMPARISON_PAGE_SIZE = DEFAULT_PAGE_SIZE
+COMPARISON_CACHE_ENTRIES = 256
+
+
+@st.cache_data(max_entries=COMPARISON_CACHE_ENTRIES, ttl=LOOKUP_TTL)
+@timed('compare_members', rows=lambda comparison: len(comparison['division_ids']))
+def compare_members(_client, member_names, division_category, after=None, limit=None):
+    if isinstance(_client, sqlite3.Connection):
+        return sqlite_backend.compare_members(_client, member_names, division_category, after, limit)
+
+    # Only ids, names and the selected members' votes; divisions none of them voted in are skipped
     query = """
-        with member := (
-            select parliament::Member 
-            filter .full_name in array_unpack(<array<str>>$selected_member_names)
-        )
-        select parliament::Division {**} {
-            division_name := .name,
+        with names := array_unpack(<array<str>>$member_names)
+        select parliament::Division {
+            id,
+            name,
             member_votes := (
                 select .votes {
                     member_name := .member.full_name,
-                    vote := .vote
+                    vote
                 }
-                filter .member.full_name in array_unpack(<array<str>>$selected_member_names)     
+                filter .member.full_name in names
             )
-        } 
-        filter .division_category = <str>$selected_division_category"""
-
-    divisions = _client.query(query, selected_member_names=selected_member_names, selected_division_category=selected_division_category)
-    
-    # Flatten the data
-    flattened_data = [
-        {
-            "division_name": obj.division_name,
-            "member_name": vote.member_name,
-            "vote": str(vote.vote),
         }
-        for obj in divisions
-        for vote in obj.member_votes
-    ]
+        filter .division_category = <str>$division_category
+            and exists (select .votes filter .member.full_name in names)
+            and ((.id > <optional uuid>$after) ?? true)
+        order by .id
+        limit <optional int64>$limit"""
 
-    # Create a DataFrame
-    df = pd.DataFrame(flattened_data)
-    return df
+    divisions = _client.query(query, member_names=list(member_names), division_category=division_category, after=after, limit=limit)
+    return comparison_from_votes(member_names, [
+        (division.id, division.name, [(vote.member_name, str(vote.vote)) for vote in division.member_votes])
+        for division in divisions
+    ])
+
+
+def comparison_pages(client, member_names, division_category, pages):
+    # Up to `pages` pages from the start of the category; also whether more remain
+    fetched, after = [], None
+    for _ in range(pages):
+        page = compare_members(client, member_names, division_category, after, COMPARISON_PAGE_SIZE)
+        if len(page['division_ids']):
+            fetched.append(page)
+        if len(page['division_ids']) < COMPARISON_PAGE_SIZE:
+            return (concat_comparisons(fetched) if fetched else empty_comparison(member_names)), False
+        after = last_division_id(page)
+    return concat_comparisons(fetched), True
+
+
+# A postcode's records are assembled from per-member vote histories, cached individually so
+# postcodes sharing members (every postcode in a state shares its senators) reuse them. Division
+# summaries are left out of the histories and fetched only for the rows on screen.
+MEMBER_RECORD_COLUMNS = ["member_name", "party", "house", "division_name", "vote", "category", "division_id"]
+MEMBER_HISTORY_CACHE_ENTRIES = 512
+
+
+@st.cache_resource(ttl=LOOKUP_TTL)
+@timed('postcode_members')
+def postcode_members(_client):
+    # Postcode -> member ids, built once from every suburb in the schema
+    if isinstance(_client, sqlite3.Connection):
+        return sqlite_backend.postcode_members(_client)
+
+    suburbs = _client.query("""
+        select parliament::Suburb {
+            postcode,
+            member_ids := .<suburbs[is parliament::Electorate].<electorates[is parliament::Member].id
+        }""")
+    index = {}
+    for suburb in suburbs:
+        index.setdefault(sqlite_backend.postcode_key(suburb.postcode), set()).update(suburb.member_ids)
+    return {postcode: tuple(sorted(member_ids, key=str)) for postcode, member_ids in index.items()}
+
+
+@st.cache_resource(max_entries=MEMBER_HISTORY_CACHE_ENTRIES, ttl=LOOKUP_TTL)
+@timed('member_vote_history')
+def member_vote_history(_client, member_id):
+    if isinstance(_client, sqlite3.Connection):
+        return sqlite_backend.member_votes(_client, member_id)
 
-@st.cache_data
-def query_member_records(_client, input_postcode):
     query = """
-        SELECT parliament::Member {
+        select parliament::Member {
             full_name,
             party_name := .party.name,
             house,
             votes: {
                 division: {
-                name,
-                summary,
-                division_category
+                    id,
+                    name,
+                    division_category
                 },
                 vote
-            },
-            electorates: {
-                name,
-                suburbs: {
-                name,
-                postcode
-                } FILTER .postcode = <str>$input_postcode
-            } FILTER .suburbs.postcode = <str>$input_postcode
-        } FILTER .electorates.suburbs.postcode = <str>$input_postcode;
+            }
+        } filter .id = <uuid>$member_id;
         """
-    members = _client.query(query, input_postcode=str(input_postcode))
+    member = _client.query_single(query, member_id=member_id)
+    if member is None:
+        return pd.DataFrame(columns=MEMBER_RECORD_COLUMNS)
 
     # Flatten the data
     flattened_data = [
         {
-            "member_name": obj.full_name,
-            "party": obj.party_name,
-            "house": str(obj.house),
+            "member_name": member.full_name,
+            "party": member.party_name,
+            "house": str(member.house),
             "division_name": vote.division.name,
             "vote": str(vote.vote),
             "category": vote.division.division_category,
+            "division_id": vote.division.id,
         }
-        for obj in members
-        for vote in obj.votes
+        for vote in member.votes
     ]
+    return pd.DataFrame(flattened_data, columns=MEMBER_RECORD_COLUMNS)
+
+
+def query_member_records(client, input_postcode):
+    member_ids = postcode_members(client).get(sqlite_backend.postcode_key(input_postcode), ())
+    if not member_ids:
+        return pd.DataFrame(columns=MEMBER_RECORD_COLUMNS)
+    return pd.concat([member_vote_history(client, member_id) for member_id in member_ids], ignore_index=True)
+
+
+@st.cache_data
+@timed('division_summaries')
+def division_summaries(_client, division_ids):
+    if isinstance(_client, sqlite3.Connection):
+        return sqlite_backend.division_summaries(_client, division_ids)
+
+    divisions = _client.query("""
+        select parliament::Division { id, summary }
+        filter .id in array_unpack(<array<uuid>>$division_ids);""", division_ids=list(division_ids))
+    return {division.id: division.summary for division in divisions}
+
+
+@st.cache_data(ttl=LOOKUP_TTL)
+@timed('division_categories')
+def query_division_categories(_client):
+    if isinstance(_client, sqlite3.Connection):
+        return sqlite_backend.division_categories(_client)
+    return sorted(_client.query("select distinct(parliament::Division.division_category);"))
+
+
+@st.cache_data(ttl=LOOKUP_TTL)
+@timed('houses')
+def query_houses(_client):
+    if isinstance(_client, sqlite3.Connection):
+        return sqlite_backend.houses(_client)
+    return sorted(str(house) for house in _client.query("select distinct(parliament::Member.house);"))
 
-    # Create a DataFrame
-    df = pd.DataFrame(flattened_data)
-    return df
+
+@st.cache_data(ttl=LOOKUP_TTL)
+@timed('members_by_party')
+def query_members_by_party(_client):
+    if isinstance(_client, sqlite3.Connection):
+        return sqlite_backend.members_by_party(_client)
+
+    members = _client.query("""
+        select parliament::Member {
+            full_name,
+            party_name := .party.name
+        } order by .party.name then .full_name;""")
+    member_names_by_party = {}
+    for member in members:
+        member_names_by_party.setdefault(member.party_name or 'Unknown', []).append(member.full_name)
+    return member_names_by_party
 
 
 def main():
@@ -92,6 +203,8 @@ def main():
     load_dotenv()
     EDGEDB_INSTANCE = os.getenv("EDGEDB_INSTANCE")
     EDGEDB_SECRET_KEY = os.getenv("EDGEDB_SECRET_KEY")
+    PARLIAMENT_BACKEND = os.getenv("PARLIAMENT_BACKEND", "edgedb")
+    SHOW_QUERY_TIMINGS = os.getenv("SHOW_QUERY_TIMINGS")
     
     # Streamlit UI setup
     st.set_page_config(
@@ -100,54 +213,50 @@ def main():
         initial_sidebar_state="expanded",
         layout="centered")
 
-    # EdgeDB client
-    client = edgedb.create_client()
+    # EdgeDB client, or a connection to the embedded SQLite mirror
+    if PARLIAMENT_BACKEND not in BACKENDS:
+        st.error(f"Unknown PARLIAMENT_BACKEND '{PARLIAMENT_BACKEND}', expected one of {', '.join(BACKENDS)}")
+        st.stop()
+    try:
+        client = create_client(PARLIAMENT_BACKEND)
+    except sqlite3.OperationalError as error:
+        # e.g. the mirror hasn't been built yet (connect() opens it read-only, so nothing is created)
+        st.error(f"Can't open the SQLite database ({error}): build it with `python -m scripts.sqlite_backend load`")
+        st.stop()
 
 
 
-    # with st.expander('select all divisions a member voted in'):
-    #     all_members = client.query("""
-    #         select distinct(parliament::Member {
-    #             full_name,
-    #             party: { name }
-    #         })""")
-        
-    #     member_names = map(lambda category: category.full_name + ", " + category.party.name, all_members)
+    with st.expander('compare how members voted'):
+        member_names_by_party = query_members_by_party(client)
 
-    #     # Sort all_members by party.name
-    #     all_members_sorted = sorted(all_members, key=attrgetter('party.name'))
+        member_col, party_col = st.columns(2)
+        with party_col:
+            selected_party = st.multiselect(label='(optional) filter member list by party', default=[party for party in ["Australian Labor Party"] if party in member_names_by_party], options=list(member_names_by_party.keys()))
 
-    #     # Group members by party.name
-    #     grouped_members = groupby(all_members_sorted, key=attrgetter('party.name'))
+        if selected_party:
+            party_members_options = [member for party in selected_party for member in member_names_by_party.get(party, [])]
+        else:
+            # If no party is selected, show all members
+            party_members_options = [member for members in member_names_by_party.values() for member in members]
 
-    #     # grouped_members is an iterable of tuples, where the first element is the party name,
-    #     # and the second element is an iterable of members in that party.
-    #     # Convert it to a dictionary where the party name is the key and the value is a list of member names:
-    #     member_names_by_party = {party: list(map(attrgetter('full_name'), members)) for party, members in grouped_members}
-        
-    #     member_col, party_col = st.columns(2)
-    #     with party_col: 
-    #         selected_party = st.multiselect(label='(optional) filter member list by party', default="Australian Labor Party", options=list(member_names_by_party.keys()))
+        with member_col:
+            selected_member_names = st.multiselect(label='members to inspect', default=[member for member in ["Anthony Albanese"] if member in party_members_options], options=party_members_options)
 
-    #     if selected_party:  
-    #         party_members_options = [member for party in selected_party for member in member_names_by_party.get(party, [])]
-    #     else:
-    #         # If no party is selected, show all members
-    #         party_members_options = [member for members in member_names_by_party.values() for member in members]
+        comparison_category = st.selectbox('type of division', options=query_division_categories(client), key='comparison_category')
 
-    #     with member_col:
-    #         selected_member_names = st.multiselect(label='members to inspect', default="Anthony Albanese", options=party_members_options)
+        # A new selection starts again from the first page
+        selection = (tuple(selected_member_names), comparison_category)
+        if st.session_state.get('comparison_selection') != selection:
+            st.session_state['comparison_selection'] = selection
+            st.session_state['comparison_pages'] = 1
 
-    #     divisions = return_divisions(client, selected_member_names=selected_member_names, selected_division_category=selected_division_category)
+        if selected_member_names:
+            comparison, more = comparison_pages(client, tuple(selected_member_names), comparison_category, st.session_state['comparison_pages'])
+            st.dataframe(comparison_frame(comparison))
+            if more:
+                st.button('load more divisions', on_click=lambda: st.session_state.update(comparison_pages=st.session_state['comparison_pages'] + 1))
 
 
-    #     # Pivot the DataFrame to get one column per member
-    #     pivot_df = divisions.pivot_table(index="division_name", columns="member_name", values="vote", aggfunc='first')
-        
-    #     st.dataframe(pivot_df)
-
-    
-    
     # Select one division at random
     random_state = 0
     with st.form(key='random_division'):
@@ -156,28 +265,39 @@ def main():
         member_records = query_member_records(client, input_postcode=input_postcode)
 
         # Filter by house
-        selected_house = st.radio("choose house", options=["representatives","senate"])
+        selected_house = st.radio("choose house", options=query_houses(client))
 
         # Filter by division_category
-        division_categories = client.query("select distinct(parliament::Division.division_category);")
-        selected_division_category =  st.radio(label='filter by type of division', options=list(division_categories))
+        division_categories = query_division_categories(client)
+        selected_division_category =  st.radio(label='filter by type of division', options=division_categories)
 
         # Filter the DataFrame by selected house and selected division category
         filtered_records = member_records.loc[
             (member_records["house"] == selected_house) & 
             (member_records["category"] == selected_division_category)
         ]
-        
-        st.write(filtered_records.sample(n=1))
+
+        if filtered_records.empty:
+            st.info('no recorded votes for this postcode, house and type of division')
+        else:
+            sampled = filtered_records.sample(n=1)
+            st.write(sampled.drop(columns="division_id"))
+
+            # Summaries are only fetched for the divisions shown
+            summaries = division_summaries(client, tuple(sampled["division_id"]))
+            for division_id in sampled["division_id"]:
+                if summaries.get(division_id):
+                    st.markdown(summaries[division_id])
         st.form_submit_button(label='new random division')
 
-    
-    
-    # Pivot the DataFrame to get one column per member
-    #pivot_df = df.pivot_table(index="division_name", columns="member_name", values="vote", aggfunc='first')
-    
-    #st.dataframe(pivot_df)
 
+    if SHOW_QUERY_TIMINGS:
+        # Only calls that reached the database are counted; cache hits cost nothing here
+        with st.sidebar.expander("query timings", expanded=True):
+            timings = pd.DataFrame(QUERY_TIMINGS.stats())
+            st.dataframe(timings.round(1), hide_index=True)
+            if not timings.empty:
+                st.caption(f"{timings['total_ms'].sum():.0f} ms in {timings['calls'].sum()} queries since the process started")
     
 
 
@@ -0,0 +1,129 @@
+import os
+import streamlit as st
+import pandas as pd
+from streamlit_agraph import agraph, Node, Edge, Config
+from scripts.agreement_layout import layout_filename, load_layout
+from scripts.interaction_matrix import HOUSES
+from scripts.division_store import DEFAULT_DIRECTORY as STORE_DIRECTORY
+from scripts.division_store import INDEX_FILENAME
+from scripts.members import HOUSE_FILENAMES
+from scripts.voting_blocs import (DEFAULT_TOP_K, agreement_filename, blocs_filename, file_signature, load_agreement,
+                                  load_voting_blocs, member_directory, top_k_similar)
+
+# Voting blocs, the agreement network and "who votes most like X" from each house's agreement
+# matrix. The blocs and the network layout are computed in the scheduled batch step
+# (python -m scripts.voting_blocs build, python -m scripts.agreement_layout build); this page only
+# reads them, and the loaded files are cached per process until the files change. The network is
+# drawn at its precomputed positions with physics off, so the browser doesn't simulate anything.
+
+MAX_TOP_K = 20
+GRAPH_SIZE = 700
+BLOC_COLOURS = ['#E4572E', '#17BEBB', '#FFC914', '#76B041', '#2E282A', '#A23B72', '#3B8EA5', '#F49D6E']
+UNALIGNED_COLOUR = '#BBBBBB'
+
+
+@st.cache_resource
+def load_house(house, signature):
+    # signature (the files' sizes and times) is only the cache key
+    return load_agreement(house), load_voting_blocs(house), load_layout(house)
+
+
+@st.cache_resource
+def load_member_directory(house, signature):
+    # Keyed by the ids the house's agreement matrix uses; signature is only the cache key
+    return member_directory(house, load_agreement(house))
+
+
+def member_label(members, member_id):
+    member = members.get(member_id)
+    return f"{member['name']} ({member['party']})" if member else f"member {member_id}"
+
+
+def draw_network(layout, voting_blocs, members):
+    blocs = {}
+    if voting_blocs is not None:
+        blocs = dict(zip(voting_blocs.member_ids.tolist(), voting_blocs.blocs.tolist()))
+    scale = GRAPH_SIZE / 2 - 20
+
+    nodes = [
+        Node(id=str(member_id), title=member_label(members, member_id), size=8,
+             color=BLOC_COLOURS[blocs[member_id] % len(BLOC_COLOURS)] if blocs.get(member_id, -1) >= 0 else UNALIGNED_COLOUR,
+             x=float(x) * scale, y=float(y) * scale, fixed=True)
+        for member_id, (x, y) in zip(layout.member_ids.tolist(), layout.positions)
+    ]
+    edges = [
+        Edge(source=str(layout.member_ids[i]), target=str(layout.member_ids[j]), color='#DDDDDD', width=float(0.5 + 2 * weight / layout.weights.max()))
+        for (i, j), weight in zip(layout.edges.tolist(), layout.weights)
+    ]
+    agraph(nodes=nodes, edges=edges, config=Config(width=GRAPH_SIZE, height=GRAPH_SIZE, directed=False, physics=False))
+
+
+def main():
+    st.set_page_config(
+        page_icon='🤝',
+        page_title="Voting blocs",
+        initial_sidebar_state="expanded",
+        layout="centered")
+
+    house = st.radio('choose house', options=HOUSES, horizontal=True)
+    matrix, voting_blocs, layout = load_house(house, tuple(file_signature(filename(house)) for filename in [agreement_filename, blocs_filename, layout_filename]))
+    if matrix is None:
+        st.info(f"No agreement matrix for the {house} yet: run `python -m scripts.interaction_matrix build`")
+        return
+
+    members = load_member_directory(house, (file_signature(HOUSE_FILENAMES[house]), file_signature(agreement_filename(house)),
+                                            file_signature(os.path.join(STORE_DIRECTORY, INDEX_FILENAME))))
+    if not members:
+        # e.g. the legacy Senate matrix, keyed by per-term member ids, with no stored votes to map them
+        st.info(f"The {house} agreement matrix can't be matched to members: run `python -m scripts.interaction_matrix build`")
+        return
+    if matrix.metadata.get('normalization'):
+        st.caption(f"Agreement from {matrix.metadata.get('source', 'an older matrix')}: {matrix.metadata['normalization']}")
+
+    st.subheader('voting blocs')
+    if voting_blocs is None:
+        st.info("Voting blocs haven't been computed yet: run `python -m scripts.voting_blocs build`")
+    else:
+        if not voting_blocs.is_current(matrix):
+            st.caption("These blocs were computed from an older agreement matrix and are refreshed by the next scheduled build.")
+
+        for bloc in range(voting_blocs.metadata['blocs']):
+            bloc_members = pd.DataFrame([
+                {'member': members[member_id]['name'] if member_id in members else f"member {member_id}",
+                 'party': members[member_id]['party'] if member_id in members else 'Unknown'}
+                for member_id in voting_blocs.members(bloc).tolist()
+            ])
+            parties = bloc_members['party'].value_counts()
+            with st.expander(f"bloc {bloc + 1}: {len(bloc_members)} members, {voting_blocs.cohesion[bloc]:.0%} average agreement"):
+                st.caption(', '.join(f"{party} {count}" for party, count in parties.items()))
+                st.dataframe(bloc_members, hide_index=True, use_container_width=True)
+
+        unaligned = voting_blocs.members(-1).tolist()
+        if unaligned:
+            st.caption(f"Not in any bloc: {', '.join(member_label(members, member_id) for member_id in unaligned)}")
+
+    st.subheader('agreement network')
+    if layout is None:
+        st.info("The network layout hasn't been computed yet: run `python -m scripts.agreement_layout build`")
+    else:
+        if not layout.is_current(matrix):
+            st.caption("This layout was computed from an older agreement matrix and is refreshed by the next scheduled build.")
+        st.caption(f"Each member is linked to the {layout.metadata['neighbours']} members they agree with most "
+                   f"({layout.metadata['edges']} links), coloured by voting bloc.")
+        draw_network(layout, voting_blocs, members)
+
+    st.subheader('who votes most like')
+    # Label -> id, listing named members first
+    options = {member_label(members, int(member_id)): int(member_id) for member_id in sorted(matrix.member_ids.tolist(), key=lambda member_id: (member_id not in members, member_label(members, member_id)))}
+    selected = st.selectbox('member', options=list(options))
+    k = st.slider('how many', min_value=1, max_value=MAX_TOP_K, value=DEFAULT_TOP_K)
+
+    similar = top_k_similar(matrix, options[selected], k)
+    st.dataframe(pd.DataFrame([
+        {'member': member_label(members, member_id), 'agreement': rate, 'divisions together': co_attendance}
+        for member_id, rate, co_attendance in similar
+    ]), hide_index=True, use_container_width=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+import os
+import time
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+from scripts.interaction_matrix import HOUSES
+from scripts.matrix_file import MatrixFile, write_matrix_file
+from scripts.voting_blocs import (MIN_CO_ATTENDANCE, affinity_matrix, agreement_rates, agreement_version, load_agreement,
+                                  spectral_embedding)
+
+# A fixed layout of each house's agreement graph, computed in the batch step so the page can draw
+# it with physics off instead of running a force simulation in the browser on every rerun:
+#
+#   1. sparsify: keep each member's NEIGHBOURS strongest agreements (k-nearest neighbours, made
+#      symmetric), so the graph has at most N * k edges instead of N^2 / 2
+#   2. lay out: Fruchterman-Reingold in NumPy over the kept edges, weighted by agreement, started
+#      from the spectral embedding and with a little gravity so unconnected members stay in view
+#
+#   data/parliament/agreement_layout/<house>.matrix   (scripts/matrix_file.py)
+#     member_ids [N], positions float32 [N, 2] in [-1, 1], edges int32 [E, 2] (row indices),
+#     weights float32 [E], plus the version of the agreement matrix it was computed from
+#
+# Build after the interaction matrices: python -m scripts.agreement_layout build
+
+DEFAULT_DIRECTORY = './data/parliament/agreement_layout'
+NEIGHBOURS = 5
+ITERATIONS = 300
+GRAVITY = 0.05
+SEED = 0
+
+
+def nearest_neighbour_edges(rates, neighbours=NEIGHBOURS):
+    # Undirected (i < j) edges to each member's strongest agreements, and their rates
+    candidates = np.argpartition(-rates, min(neighbours, len(rates) - 1), axis=1)[:, :neighbours]
+    rows = np.repeat(np.arange(len(rates)), candidates.shape[1])
+    columns = candidates.ravel()
+    keep = rates[rows, columns] > 0
+    pairs = np.sort(np.stack([rows[keep], columns[keep]], axis=1), axis=1)
+    edges = np.unique(pairs, axis=0).astype(np.int32)
+    return edges, rates[edges[:, 0], edges[:, 1]].astype(np.float32)
+
+
+def initial_positions(rates, rng):
+    # The two leading non-trivial spectral coordinates of the connected members; random otherwise
+    positions = rng.uniform(-1, 1, (len(rates), 2))
+    affinity = affinity_matrix(rates)
+    connected = affinity.sum(axis=1) > 0
+    if connected.sum() > 3:
+        _, embedding = spectral_embedding(affinity[np.ix_(connected, connected)], 3)
+        coordinates = embedding[:, 1:3]
+        positions[connected] = coordinates / np.maximum(np.abs(coordinates).max(axis=0), 1e-12)
+    return positions
+
+
+def force_layout(positions, edges, weights, iterations=ITERATIONS, gravity=GRAVITY):
+    # Fruchterman-Reingold: every pair repels, edges attract in proportion to their weight, and
+    # the step size cools linearly
+    positions = positions.astype(np.float64).copy()
+    count = len(positions)
+    if count < 2:
+        return positions
+    spacing = np.sqrt(4.0 / count)
+    weights = weights / weights.max() if len(weights) else weights
+    temperature = 0.1
+
+    for iteration in range(iterations):
+        delta = positions[:, None, :] - positions[None, :, :]
+        distance = np.maximum(np.sqrt((delta ** 2).sum(axis=2)), 1e-9)
+        displacement = (delta * (spacing ** 2 / distance ** 2)[:, :, None]).sum(axis=1)
+
+        if len(edges):
+            edge_delta = positions[edges[:, 0]] - positions[edges[:, 1]]
+            edge_distance = np.maximum(np.sqrt((edge_delta ** 2).sum(axis=1)), 1e-9)
+            pull = edge_delta * (edge_distance * weights / spacing)[:, None]
+            np.add.at(displacement, edges[:, 0], -pull)
+            np.add.at(displacement, edges[:, 1], pull)
+
+        displacement -= gravity * positions * count * spacing
+        length = np.maximum(np.sqrt((displacement ** 2).sum(axis=1)), 1e-9)
+        step = temperature * (1 - iteration / iterations)
+        positions += displacement * (np.minimum(length, step) / length)[:, None]
+
+    # Centre and scale into [-1, 1]
+    positions -= (positions.max(axis=0) + positions.min(axis=0)) / 2
+    return positions / max(np.abs(positions).max(), 1e-12)
+
+
+def compute_layout(matrix, neighbours=NEIGHBOURS, min_co_attendance=MIN_CO_ATTENDANCE, iterations=ITERATIONS, seed=SEED):
+    rates = agreement_rates(matrix, min_co_attendance)
+    edges, weights = nearest_neighbour_edges(rates, neighbours)
+    positions = force_layout(initial_positions(rates, np.random.default_rng(seed)), edges, weights, iterations)
+    return {
+        'member_ids': matrix.member_ids.astype(np.int64),
+        'positions': positions.astype(np.float32),
+        'edges': edges,
+        'weights': weights,
+        'metadata': {
+            'house': matrix.metadata.get('house'),
+            'neighbours': neighbours,
+            'min_co_attendance': min_co_attendance,
+            'iterations': iterations,
+            'seed': seed,
+            'edges': int(len(edges)),
+            'source': os.path.basename(matrix.file.filename),
+            'source_version': agreement_version(matrix),
+            'built_at': datetime.now().isoformat(timespec='seconds'),
+        },
+    }
+
+
+def layout_filename(house, directory=DEFAULT_DIRECTORY):
+    return os.path.join(directory, f"{house}.matrix")
+
+
+def save_layout(layout, filename):
+    arrays = {name: array for name, array in layout.items() if name != 'metadata'}
+    write_matrix_file(filename, arrays, layout['metadata'])
+
+
+class AgreementLayout:
+    def __init__(self, filename):
+        matrix_file = MatrixFile(filename)
+        self.metadata = matrix_file.metadata
+        self.member_ids = np.array(matrix_file['member_ids'])
+        self.positions = np.array(matrix_file['positions'])
+        self.edges = np.array(matrix_file['edges'])
+        self.weights = np.array(matrix_file['weights'])
+
+    def is_current(self, matrix):
+        return matrix is not None and self.metadata.get('source_version') == agreement_version(matrix)
+
+
+def load_layout(house, directory=DEFAULT_DIRECTORY):
+    filename = layout_filename(house, directory)
+    if not os.path.exists(filename):
+        return None
+    return AgreementLayout(filename)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Sparsify each house\'s agreement graph and lay it out once')
+    parser.add_argument('command', choices=['build'])
+    parser.add_argument('--house', choices=HOUSES + ['both'], default='both')
+    parser.add_argument('--neighbours', type=int, default=NEIGHBOURS)
+    parser.add_argument('--iterations', type=int, default=ITERATIONS)
+    parser.add_argument('--directory', default=DEFAULT_DIRECTORY)
+    args = parser.parse_args()
+
+    for house in (HOUSES if args.house == 'both' else [args.house]):
+        matrix = load_agreement(house)
+        if matrix is None:
+            print(f"{house}: no agreement matrix; run python -m scripts.interaction_matrix build first")
+            continue
+        started = time.perf_counter()
+        layout = compute_layout(matrix, args.neighbours, iterations=args.iterations)
+        elapsed = time.perf_counter() - started
+
+        filename = layout_filename(house, args.directory)
+        save_layout(layout, filename)
+        count = len(layout['member_ids'])
+        print(f"{house}: {count} members, {layout['metadata']['edges']} edges (of {count * (count - 1) // 2}) "
+              f"laid out in {elapsed * 1000:.0f} ms -> {filename}")
@@ -0,0 +1,145 @@
+import os
+import json
+import argparse
+import threading
+from datetime import date, datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+
+from scripts.division_store import DEFAULT_DIRECTORY, open_store
+from scripts.fetch_divisions import fetch_division_details, fetch_division_list
+from scripts.tvfy_client import create_session
+
+# Backfill a long date range of divisions window by window:
+#   python -m scripts.backfill_divisions --start-date 2022-07-26 --end-date 2024-12-31
+# Every finished window is appended to the division store and recorded in a checkpoint file,
+# so rerunning the same command after an interruption picks up from the unfinished windows, even
+# on a later day with the default --end-date.
+
+# The list endpoint caps each response, so a window that comes back full is split in half
+PAGE_SIZE = 100
+DEFAULT_WINDOW_DAYS = 7
+DEFAULT_WINDOW_WORKERS = 4
+DEFAULT_DETAIL_WORKERS = 4
+CHECKPOINT_FILENAME = os.path.join(DEFAULT_DIRECTORY, 'backfill_checkpoint.json')
+
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def split_windows(start_date, end_date, window_days=DEFAULT_WINDOW_DAYS):
+    # Inclusive (start, end) windows covering the range, newest first. They're counted forward from
+    # start_date, so resuming with a later end date (the default is today) only changes the last one
+    windows = []
+    window_start = start_date
+    while window_start <= end_date:
+        window_end = min(end_date, window_start + timedelta(days=window_days - 1))
+        windows.append((window_start, window_end))
+        window_start = window_end + timedelta(days=1)
+    return windows[::-1]
+
+
+def window_key(window):
+    return f"{window[0].isoformat()}/{window[1].isoformat()}"
+
+
+def load_checkpoint(filename):
+    if not os.path.exists(filename):
+        return set()
+    with open(filename, 'r') as f:
+        return set(json.load(f).get('completed', []))
+
+
+def save_checkpoint(filename, completed):
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    temporary = filename + '.tmp'
+    with open(temporary, 'w') as f:
+        json.dump({'completed': sorted(completed), 'updated_at': datetime.now().isoformat(timespec='seconds')}, f)
+    os.replace(temporary, filename)
+
+
+def list_window(session, api_key, window):
+    # All division summaries in a window, halving it while the endpoint returns a full page
+    start, end = window
+    summaries = fetch_division_list(session, api_key, start.isoformat(), end.isoformat())
+    if summaries is None:
+        raise RuntimeError(f"Failed to list divisions for {window_key(window)}")
+
+    if len(summaries) >= PAGE_SIZE and start < end:
+        middle = start + (end - start) // 2
+        return list_window(session, api_key, (start, middle)) + list_window(session, api_key, (middle + timedelta(days=1), end))
+    if len(summaries) >= PAGE_SIZE:
+        print(f"Warning: {start} returned a full page of {len(summaries)} divisions; some may be missing")
+    return summaries
+
+
+def backfill_divisions(api_key, start_date, end_date, window_days=DEFAULT_WINDOW_DAYS,
+                       window_workers=DEFAULT_WINDOW_WORKERS, detail_workers=DEFAULT_DETAIL_WORKERS,
+                       checkpoint_filename=CHECKPOINT_FILENAME, store=None):
+    store = store or open_store()
+    completed = load_checkpoint(checkpoint_filename)
+
+    windows = [w for w in split_windows(start_date, end_date, window_days) if window_key(w) not in completed]
+    print(f"Backfilling {start_date} to {end_date}: {len(windows)} window(s) to fetch, {len(completed)} already done")
+
+    # Ids we hold or that another window has claimed, so no division is fetched twice
+    claimed = store.ids()
+    claimed_lock = threading.Lock()
+
+    def fetch_window(window):
+        summaries = list_window(session, api_key, window)
+        with claimed_lock:
+            missing_ids = [s['id'] for s in summaries if 'id' in s and int(s['id']) not in claimed]
+            claimed.update(int(division_id) for division_id in missing_ids)
+        details = fetch_division_details(session, api_key, missing_ids, max_workers=detail_workers)
+        return [details[division_id] for division_id in missing_ids if division_id in details], len(missing_ids)
+
+    appended = 0
+    failed_windows = []
+    with create_session(max_workers=window_workers * detail_workers) as session:
+        with ThreadPoolExecutor(max_workers=window_workers) as executor:
+            futures = {executor.submit(fetch_window, window): window for window in windows}
+            for future in as_completed(futures):
+                window = futures[future]
+                try:
+                    divisions, wanted = future.result()
+                except Exception as e:
+                    print(f"Window {window_key(window)} failed: {e}")
+                    failed_windows.append(window)
+                    continue
+
+                # Persist the window before recording it as done
+                appended += store.append(divisions)
+                if len(divisions) < wanted:
+                    print(f"Window {window_key(window)}: {wanted - len(divisions)} division(s) failed; will retry next run")
+                    failed_windows.append(window)
+                    continue
+
+                completed.add(window_key(window))
+                save_checkpoint(checkpoint_filename, completed)
+                print(f"Added {len(divisions)} divisions for {window_key(window)}")
+
+    print(f"Backfill finished: {appended} divisions added, {len(failed_windows)} window(s) to retry")
+    return appended, failed_windows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Backfill a date range of divisions with checkpoint/resume')
+    parser.add_argument('--start-date', required=True, type=parse_date, help='YYYY-MM-DD')
+    parser.add_argument('--end-date', type=parse_date, default=date.today(), help='YYYY-MM-DD (default: today)')
+    parser.add_argument('--window-days', type=int, default=DEFAULT_WINDOW_DAYS)
+    parser.add_argument('--window-workers', type=int, default=DEFAULT_WINDOW_WORKERS, help='windows fetched in parallel')
+    parser.add_argument('--detail-workers', type=int, default=DEFAULT_DETAIL_WORKERS, help='detail requests per window')
+    parser.add_argument('--checkpoint', default=CHECKPOINT_FILENAME)
+    parser.add_argument('--restart', action='store_true', help='ignore the checkpoint and refetch every window')
+    args = parser.parse_args()
+
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    load_dotenv()
+    api_key = os.getenv("TVFY_API_KEY")
+    backfill_divisions(api_key, args.start_date, args.end_date, args.window_days,
+                       args.window_workers, args.detail_workers, args.checkpoint)
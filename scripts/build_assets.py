@@ -0,0 +1,74 @@
+import os
+import argparse
+
+# Pre-sized, recompressed variants of the header photo, served by Streamlit's static file serving
+# (server.enableStaticServing in .streamlit/config.toml) from app/static/... instead of being
+# base64-inlined into every page. Rebuild after changing the source image:
+#   python -m scripts.build_assets
+#
+#   static/img/header/parliament-<width>.webp   for browsers with WebP (all current ones)
+#   static/img/header/parliament-<width>.jpg    fallback
+
+SOURCE_FILENAME = './static/img/Parliament-House-Australia-Thennicke.jpg'
+OUTPUT_DIRECTORY = './static/img/header'
+STATIC_URL = 'app/static/img/header'
+NAME = 'parliament'
+WIDTHS = [480, 768, 1200]
+FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 72, 'method': 6},
+    'jpg': {'format': 'JPEG', 'quality': 70, 'optimize': True, 'progressive': True},
+}
+
+
+def variant_filename(width, extension, directory=OUTPUT_DIRECTORY):
+    return os.path.join(directory, f"{NAME}-{width}.{extension}")
+
+
+def variant_url(width, extension):
+    return f"{STATIC_URL}/{NAME}-{width}.{extension}"
+
+
+def build_header_variants(source=SOURCE_FILENAME, directory=OUTPUT_DIRECTORY):
+    from PIL import Image
+
+    os.makedirs(directory, exist_ok=True)
+    written = []
+    with Image.open(source) as image:
+        image = image.convert('RGB')
+        for width in WIDTHS:
+            width = min(width, image.width)
+            height = round(image.height * width / image.width)
+            resized = image.resize((width, height), Image.LANCZOS) if width != image.width else image
+            for extension, options in FORMATS.items():
+                filename = variant_filename(width, extension, directory)
+                resized.save(filename, **options)
+                written.append((filename, os.path.getsize(filename)))
+    return written
+
+
+def header_variants_available(directory=OUTPUT_DIRECTORY):
+    return all(os.path.exists(variant_filename(width, extension, directory)) for width in WIDTHS for extension in FORMATS)
+
+
+def header_background_css(selector):
+    # Smallest variant on narrow screens, the middle one by default, the largest on high-DPI screens;
+    # WebP where supported via image-set, with the JPEG declaration first as a fallback
+    def background(width):
+        return (f"background-image: url({variant_url(width, 'jpg')}); "
+                f"background-image: image-set(url({variant_url(width, 'webp')}) type('image/webp'), url({variant_url(width, 'jpg')}) type('image/jpeg'));")
+
+    small, medium, large = WIDTHS
+    return (f"{selector} {{ {background(medium)} }}\n"
+            f"@media (max-width: {small}px) {{ {selector} {{ {background(small)} }} }}\n"
+            f"@media (min-width: {small + 1}px) and (min-resolution: 2dppx) {{ {selector} {{ {background(large)} }} }}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Build pre-sized static image variants for the app')
+    parser.add_argument('--source', default=SOURCE_FILENAME)
+    parser.add_argument('--directory', default=OUTPUT_DIRECTORY)
+    args = parser.parse_args()
+
+    original = os.path.getsize(args.source)
+    for filename, size in build_header_variants(args.source, args.directory):
+        print(f"{filename}: {size / 1024:.1f} KiB ({size / original:.0%} of the original)")
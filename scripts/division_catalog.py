@@ -0,0 +1,230 @@
+import os
+import re
+import json
+import hashlib
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+from scripts.division_categories import CATEGORIES, classify_division
+from scripts.division_store import open_store, segment_name, segment_number
+from scripts.matrix_file import MatrixFile, write_matrix_file
+
+# Everything the division picker needs, built once per data refresh from the division store index
+# (names, houses and dates only; no votes or summaries are read):
+#
+#   categories  {category: [[label, division_id], ...]}, and for Bills
+#               {'Bills': {bill name: [[stage, division_id], ...]}}, in store order, with
+#               labels made unique within each list
+#   divisions   {division_id: {name, house, date, segment, offset, length}}
+#
+# It is saved next to the store in pieces, so the app only ever parses what it shows:
+#
+#   catalog.json            header: index signature, per-category counts
+#   catalog/<category>.json one picker list per category, loaded the first time it's picked
+#   catalog/locations.matrix sorted division ids with their segment/offset/length, memory-mapped,
+#                           so any division is found with a binary search
+#
+# The header is tagged with the index file's size and a hash of its contents. It can't use file
+# times, because those change on every checkout and a fresh clone would rebuild the committed
+# catalog. The hash is remembered per size and mtime, so within a process a stale catalog is still
+# detected with one stat(), and then rebuilt.
+#   python -m scripts.division_catalog build
+
+CATALOG_FILENAME = 'catalog.json'
+CATEGORY_DIRECTORY = 'catalog'
+LOCATIONS_FILENAME = 'locations.matrix'
+ENTRY_FIELDS = ['name', 'house', 'date', 'segment', 'offset', 'length']
+
+_index_hashes = {}
+
+
+def index_signature(store):
+    # [size, content hash] of the index; only rehashed when its size or mtime changes
+    if not store.exists():
+        return None
+    stat = os.stat(store.index_path)
+    key = (stat.st_size, stat.st_mtime_ns)
+    cached = _index_hashes.get(store.index_path)
+    if cached is None or cached[0] != key:
+        with open(store.index_path, 'rb') as f:
+            digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+        cached = _index_hashes[store.index_path] = (key, [stat.st_size, digest])
+    return list(cached[1])
+
+
+def disambiguate_labels(entries, divisions):
+    # Repeated labels (e.g. several "in Committee" divisions on one bill) get their date, then id
+    counts = {}
+    for label, _ in entries:
+        counts[label] = counts.get(label, 0) + 1
+    seen = set()
+    for entry in entries:
+        label, division_id = entry
+        if counts[label] > 1:
+            label = f"{label} ({divisions[str(division_id)].get('date')})"
+            if label in seen:
+                label = f"{label} #{division_id}"
+        seen.add(label)
+        entry[0] = label
+
+
+def build_catalog(store, index=None):
+    index = index if index is not None else store.read_index()
+    categories = {category: {} if category == 'Bills' else [] for category in CATEGORIES}
+    divisions = {}
+    unrecognised = 0
+
+    for division_id, entry in index.items():
+        name = entry.get('name') or ''
+        divisions[str(division_id)] = {field: entry.get(field) for field in ENTRY_FIELDS}
+
+        classified = classify_division(name)
+        if classified is None:
+            unrecognised += 1
+            continue
+
+        category, bill_name, label = classified
+        if category == 'Bills':
+            categories['Bills'].setdefault(bill_name, []).append([label, division_id])
+        else:
+            categories[category].append([label, division_id])
+
+    # Labels are what the picker shows, so make repeats within a group distinguishable
+    for category, group in categories.items():
+        for entries in group.values() if category == 'Bills' else [group]:
+            disambiguate_labels(entries, divisions)
+
+    return {
+        'signature': index_signature(store),
+        'built_at': datetime.now().isoformat(timespec='seconds'),
+        'unrecognised': unrecognised,
+        'categories': categories,
+        'divisions': divisions,
+    }
+
+
+def catalog_path(store):
+    return os.path.join(store.directory, CATALOG_FILENAME)
+
+
+def category_path(store, category):
+    slug = re.sub(r'[^a-z0-9]+', '_', category.lower()).strip('_')
+    return os.path.join(store.directory, CATEGORY_DIRECTORY, f"{slug}.json")
+
+
+def locations_path(store):
+    return os.path.join(store.directory, CATEGORY_DIRECTORY, LOCATIONS_FILENAME)
+
+
+def write_json(path, value):
+    temporary = path + '.tmp'
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(value, f, ensure_ascii=False)
+    os.replace(temporary, path)
+
+
+def save_catalog(store, catalog):
+    os.makedirs(os.path.join(store.directory, CATEGORY_DIRECTORY), exist_ok=True)
+
+    for category, group in catalog['categories'].items():
+        write_json(category_path(store, category), group)
+
+    ids = np.array(sorted(int(division_id) for division_id in catalog['divisions']), dtype=np.int64)
+    entries = [catalog['divisions'][str(division_id)] for division_id in ids.tolist()]
+    write_matrix_file(locations_path(store), {
+        'ids': ids,
+        'segments': np.array([segment_number(entry['segment']) for entry in entries], dtype=np.int32),
+        'offsets': np.array([entry['offset'] for entry in entries], dtype=np.int64),
+        'lengths': np.array([entry['length'] for entry in entries], dtype=np.int64),
+    })
+
+    # The header goes last: its signature is what marks the pieces above as current
+    write_json(catalog_path(store), {
+        'signature': catalog['signature'],
+        'built_at': catalog['built_at'],
+        'unrecognised': catalog['unrecognised'],
+        'categories': {category: len(group) for category, group in catalog['categories'].items()},
+        'divisions': len(catalog['divisions']),
+    })
+
+
+class Catalog:
+    # The saved catalog, read lazily: category lists on first use, locations by binary search
+    def __init__(self, store, header):
+        self.store = store
+        self.header = header
+        self.signature = header['signature']
+        self._categories = {}
+        self._locations = None
+
+    def category_names(self):
+        return list(self.header['categories'])
+
+    def category(self, category):
+        if category not in self._categories:
+            with open(category_path(self.store, category), 'r', encoding='utf-8') as f:
+                self._categories[category] = json.load(f)
+        return self._categories[category]
+
+    def locations(self):
+        if self._locations is None:
+            self._locations = MatrixFile(locations_path(self.store))
+        return self._locations
+
+    def location(self, division_id):
+        locations = self.locations()
+        ids = locations['ids']
+        i = int(np.searchsorted(ids, int(division_id)))
+        if i == len(ids) or ids[i] != int(division_id):
+            return None
+        return {
+            'segment': segment_name(int(locations['segments'][i])),
+            'offset': int(locations['offsets'][i]),
+            'length': int(locations['lengths'][i]),
+        }
+
+
+def read_catalog_header(store):
+    path = catalog_path(store)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        header = json.load(f)
+    # Catalogs saved before the split kept everything in this one file
+    if not isinstance(header.get('divisions'), int):
+        return None
+    return header
+
+
+def load_catalog(store=None):
+    # The saved catalog if it matches the current index, otherwise a freshly built (and saved) one
+    store = store or open_store()
+    if not store.exists():
+        return None
+
+    header = read_catalog_header(store)
+    if header is None or header.get('signature') != index_signature(store):
+        save_catalog(store, build_catalog(store))
+        header = read_catalog_header(store)
+    return Catalog(store, header)
+
+
+def catalog_division(store, catalog, division_id):
+    # Read one division straight from its segment using the catalog's byte range
+    entry = catalog.location(division_id)
+    if entry is None:
+        return None
+    return store.read_entry(entry)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Build the division picker catalog')
+    parser.add_argument('command', choices=['build'])
+    args = parser.parse_args()
+
+    store = open_store()
+    catalog = build_catalog(store)
+    save_catalog(store, catalog)
+    print(f"Catalogued {len(catalog['divisions'])} divisions ({catalog['unrecognised']} unrecognised) -> {catalog_path(store)}")
@@ -0,0 +1,45 @@
+import re
+
+# Division names look like "<Category> - <detail>", except bills ("Bills — <Name> Bill 2023 - <stage>"),
+# which are grouped by bill with the stage of the bill as the label
+
+PREFIX_CATEGORIES = ['Matters of Urgency', 'Business', 'Documents', 'Committees', 'Motions']
+CATEGORIES = PREFIX_CATEGORIES + ['Bills', 'Budget', 'Regulations and Determinations', 'Statements']
+
+# Regular expression patterns for different division formats
+bill_pattern = re.compile(r"^(Bills? —? .+? \d{4})[;,]?( in Committee - | - |;)?(.*)")
+budget_pattern = re.compile(r"^(Budget) - (.+) - (.+)")
+reg_det_pattern = re.compile(r"^(Regulations and Determinations) - (.+?) - (.+)")
+statement_pattern = re.compile(r"^(Statements) — (.+)")
+
+
+def classify_division(name):
+    # Returns (category, bill name or None, label), or None for an unrecognised format
+    for category in PREFIX_CATEGORIES:
+        if name.startswith(category):
+            # Strip out the category and " - " to get the clean name
+            return category, None, name[len(category) + 3:]
+
+    match = budget_pattern.match(name)
+    if match:
+        return 'Budget', None, match.group(2).strip() + " - " + match.group(3).strip()
+
+    match = reg_det_pattern.match(name)
+    if match:
+        return 'Regulations and Determinations', None, match.group(2).strip() + " - " + match.group(3).strip()
+
+    match = statement_pattern.match(name)
+    if match:
+        return 'Statements', None, match.group(2).strip()
+
+    match = bill_pattern.match(name)
+    if match:
+        # Extract the bill name (including year) and division stage
+        return 'Bills', match.group(1).strip(), match.group(3).strip() if match.group(3) else "General"
+
+    return None
+
+
+def division_category(name):
+    classified = classify_division(name or '')
+    return classified[0] if classified else ''
@@ -0,0 +1,254 @@
+import os
+import json
+import argparse
+import threading
+
+# Divisions live in append-only JSONL segments, one division per line, next to a small index
+# (one line per division: id, date, house, name, sequence number, segment and byte range).
+# Checking which ids we hold or listing divisions only reads the index, never the vote payloads.
+#
+#   data/parliament/divisions/index.jsonl
+#   data/parliament/divisions/segment-000000.jsonl
+#
+# Appends write the records first and the index lines second, each flushed and fsynced, so a
+# crash leaves at most an unindexed tail in a segment or a partial last index line. Both are
+# ignored on read and trimmed before the next append; compaction drops any orphaned bytes.
+
+DEFAULT_DIRECTORY = './data/parliament/divisions'
+LEGACY_FILENAME = './data/parliament/divisions.json'
+INDEX_FILENAME = 'index.jsonl'
+SEGMENT_BYTES = 32 * 1024 * 1024
+INDEX_FIELDS = ['id', 'date', 'house', 'name']
+
+
+def segment_name(number):
+    return f"segment-{number:06d}.jsonl"
+
+
+def segment_number(name):
+    return int(name[len('segment-'):-len('.jsonl')])
+
+
+def trim_partial_line(path):
+    # Drop anything after the last newline, left behind by an interrupted write
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb+') as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b'\n':
+            return
+        position = size
+        while position > 0:
+            step = min(4096, position)
+            position -= step
+            f.seek(position)
+            chunk = f.read(step)
+            newline = chunk.rfind(b'\n')
+            if newline != -1:
+                f.truncate(position + newline + 1)
+                return
+        f.truncate(0)
+
+
+def write_lines(path, lines):
+    # Append encoded lines and make them durable; returns the offset the first line starts at
+    with open(path, 'ab') as f:
+        offset = f.tell()
+        f.write(b''.join(lines))
+        f.flush()
+        os.fsync(f.fileno())
+    return offset
+
+
+class DivisionStore:
+    def __init__(self, directory=DEFAULT_DIRECTORY):
+        self.directory = directory
+        self.index_path = os.path.join(directory, INDEX_FILENAME)
+        self._lock = threading.Lock()
+
+    def segment_path(self, name):
+        return os.path.join(self.directory, name)
+
+    def segments(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name for name in os.listdir(self.directory) if name.startswith('segment-') and name.endswith('.jsonl'))
+
+    def exists(self):
+        return os.path.exists(self.index_path)
+
+    def read_index(self):
+        # {division_id: entry}, in append order; a later entry for the same id replaces the earlier one
+        entries = {}
+        if not os.path.exists(self.index_path):
+            return entries
+
+        with open(self.index_path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # partial line from an interrupted append
+                entry = json.loads(line)
+                entries.pop(entry['id'], None)
+                entries[entry['id']] = entry
+        return entries
+
+    def ids(self):
+        return set(self.read_index())
+
+    def last_seq(self):
+        return max((entry['seq'] for entry in self.read_index().values()), default=-1)
+
+    def read_entry(self, entry):
+        with open(self.segment_path(entry['segment']), 'rb') as f:
+            f.seek(entry['offset'])
+            return json.loads(f.read(entry['length']))
+
+    def get(self, division_id, index=None):
+        entry = (index if index is not None else self.read_index()).get(int(division_id))
+        if entry is None:
+            return None
+        return self.read_entry(entry)
+
+    def iter_records(self, index=None):
+        # Stream (entry, raw JSON bytes) in append order without decoding the payload
+        index = index if index is not None else self.read_index()
+        handles = {}
+        try:
+            for entry in index.values():
+                if entry['segment'] not in handles:
+                    handles[entry['segment']] = open(self.segment_path(entry['segment']), 'rb')
+                f = handles[entry['segment']]
+                f.seek(entry['offset'])
+                yield entry, f.read(entry['length'])
+        finally:
+            for f in handles.values():
+                f.close()
+
+    def iter_divisions(self, index=None):
+        for _, record in self.iter_records(index):
+            yield json.loads(record)
+
+    def load_all(self):
+        # The shape the app has always used: {str(division_id): division}
+        return {str(division['id']): division for division in self.iter_divisions()}
+
+    def _active_segment(self):
+        segments = self.segments()
+        if not segments:
+            return segment_name(0)
+        name = segments[-1]
+        if os.path.getsize(self.segment_path(name)) >= SEGMENT_BYTES:
+            return segment_name(segment_number(name) + 1)
+        return name
+
+    def append(self, divisions):
+        divisions = [division for division in divisions if 'id' in division]
+        if not divisions:
+            return 0
+
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            trim_partial_line(self.index_path)
+            seq = self.last_seq() + 1
+
+            name = self._active_segment()
+            path = self.segment_path(name)
+            trim_partial_line(path)
+
+            records = [(json.dumps(division, ensure_ascii=False) + '\n').encode('utf-8') for division in divisions]
+            offset = write_lines(path, records)
+
+            index_lines = []
+            for division, record in zip(divisions, records):
+                entry = {field: division.get(field) for field in INDEX_FIELDS}
+                entry['id'] = int(division['id'])
+                entry.update({'seq': seq, 'segment': name, 'offset': offset, 'length': len(record)})
+                index_lines.append((json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8'))
+                offset += len(record)
+                seq += 1
+            write_lines(self.index_path, index_lines)
+
+        return len(divisions)
+
+    def compact(self):
+        # Rewrite live records into fresh segments and swap in a new index in one rename.
+        # Sequence numbers are preserved so anything keyed on them stays valid.
+        with self._lock:
+            index = self.read_index()
+            old_segments = self.segments()
+            number = segment_number(old_segments[-1]) + 1 if old_segments else 0
+
+            new_index = []
+            name, size, handle = None, 0, None
+            try:
+                for entry, line in self.iter_records(index):
+                    if handle is None or size >= SEGMENT_BYTES:
+                        if handle is not None:
+                            handle.flush()
+                            os.fsync(handle.fileno())
+                            handle.close()
+                            number += 1
+                        name, size = segment_name(number), 0
+                        handle = open(self.segment_path(name), 'wb')
+                    new_index.append(dict(entry, segment=name, offset=size, length=len(line)))
+                    handle.write(line)
+                    size += len(line)
+            finally:
+                if handle is not None:
+                    handle.flush()
+                    os.fsync(handle.fileno())
+                    handle.close()
+
+            temporary = self.index_path + '.tmp'
+            with open(temporary, 'wb') as f:
+                for entry in new_index:
+                    f.write((json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary, self.index_path)
+
+            for old in old_segments:
+                os.remove(self.segment_path(old))
+
+        return len(new_index)
+
+    def import_legacy(self, filename=LEGACY_FILENAME):
+        # One-off migration from the old single-file divisions.json
+        with open(filename, 'r', encoding='utf-8') as f:
+            legacy = json.load(f)
+        held = self.ids()
+        return self.append(division for division in legacy.values() if int(division['id']) not in held)
+
+
+def open_store(directory=DEFAULT_DIRECTORY, legacy_filename=LEGACY_FILENAME):
+    # Open the store, migrating the legacy divisions.json the first time it's seen
+    store = DivisionStore(directory)
+    if not store.exists() and os.path.exists(legacy_filename):
+        store.import_legacy(legacy_filename)
+    return store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Maintain the append-only division store')
+    parser.add_argument('command', choices=['stats', 'compact', 'migrate'])
+    parser.add_argument('--directory', default=DEFAULT_DIRECTORY)
+    parser.add_argument('--legacy-file', default=LEGACY_FILENAME)
+    args = parser.parse_args()
+
+    store = DivisionStore(args.directory)
+    if args.command == 'migrate':
+        print(f"Imported {store.import_legacy(args.legacy_file)} divisions from {args.legacy_file}")
+    elif args.command == 'compact':
+        before = sum(os.path.getsize(store.segment_path(name)) for name in store.segments())
+        count = store.compact()
+        after = sum(os.path.getsize(store.segment_path(name)) for name in store.segments())
+        print(f"Compacted {count} divisions: {before / 1024:.0f} KiB -> {after / 1024:.0f} KiB")
+    else:
+        index = store.read_index()
+        houses = {}
+        for entry in index.values():
+            houses[entry['house']] = houses.get(entry['house'], 0) + 1
+        print(f"{len(index)} divisions in {len(store.segments())} segment(s): {houses}")
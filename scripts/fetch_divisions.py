@@ -1,56 +1,70 @@
 import os
+import argparse
 from dotenv import load_dotenv
-import json
-import requests
-
-def fetch_divisions(api_key, start_date=None, end_date=None):
-    # Define the directory and filename for storing divisions
-    directory = './data/parliament'
-    filename = f"{directory}/divisions.json"
-    
-    # Create directory if it doesn't exist
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-    
+
+from scripts.division_store import open_store
+from scripts.tvfy_client import DEFAULT_MAX_WORKERS, create_session, fetch_many, get_json
+
+
+def fetch_division_list(session, api_key, start_date=None, end_date=None):
     if start_date is None or end_date is None:
         # Fetch the most recent 100 divisions
-        url = f"https://theyvoteforyou.org.au/api/v1/divisions.json?key={api_key}"
-        response = requests.get(url)
+        params = {}
     else:
         # Fetch divisions within date range
-        url = f"https://theyvoteforyou.org.au/api/v1/divisions.json?start_date={start_date}&end_date={end_date}&key={api_key}"
-        response = requests.get(url)
+        params = {'start_date': start_date, 'end_date': end_date}
+
+    response = get_json(session, 'divisions.json', api_key, params=params)
     if response.status_code != 200:
-        st.write(f"Failed to get divisions: {response.status_code}")
+        print(f"Failed to get divisions: {response.status_code}")
         return None
-    
-    recent_divisions = response.json()
-    
-    # Load existing divisions from the file, if any
-    existing_divisions = {}
-    if os.path.exists(filename):
-        with open(filename, 'r') as f:
-            existing_divisions = json.load(f)
-    
-    # Iterate through each division to get details
-    for division in recent_divisions:
-        division_id = division.get('id', 'unknown_id')
-        if division_id not in existing_divisions:
-            # Fetch details of the new division
-            detail_url = f"https://theyvoteforyou.org.au/api/v1/divisions/{division_id}.json?key={api_key}"
-            detail_response = requests.get(detail_url)
-            if detail_response.status_code == 200:
-                division_detail = detail_response.json()
-                
-                # Store new division details
-                existing_divisions[division_id] = division_detail
-    
-    # Save all division data back to the file
-    with open(filename, 'w') as f:
-        json.dump(existing_divisions, f)
+    return response.json()
+
+
+def fetch_division_details(session, api_key, division_ids, max_workers=DEFAULT_MAX_WORKERS):
+    def fetch_one(division_id):
+        response = get_json(session, f'divisions/{division_id}.json', api_key)
+        if response.status_code != 200:
+            print(f"Failed to get division {division_id}: {response.status_code}")
+            return None, 0
+        return response.json(), len(response.content)
+
+    details, _ = fetch_many(division_ids, fetch_one, max_workers=max_workers, label='division details')
+    return details
+
+
+def fetch_divisions(api_key, start_date=None, end_date=None, max_workers=DEFAULT_MAX_WORKERS, store=None):
+    # Divisions are appended to the division store (see scripts/division_store.py)
+    store = store or open_store()
+
+    with create_session(max_workers=max_workers) as session:
+        recent_divisions = fetch_division_list(session, api_key, start_date, end_date)
+        if recent_divisions is None:
+            return None
+
+        # Only the index is read to find out which divisions we already hold
+        existing_ids = store.ids()
+        missing_ids = [
+            division['id'] for division in recent_divisions
+            if 'id' in division and int(division['id']) not in existing_ids
+        ]
+
+        # Fetch details of the new divisions concurrently
+        details = fetch_division_details(session, api_key, missing_ids, max_workers=max_workers)
+
+    # Append only the new divisions, in list order
+    store.append(details[division_id] for division_id in missing_ids if division_id in details)
+
+    return details
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Fetch recent divisions from They Vote For You')
+    parser.add_argument('--start-date', help='YYYY-MM-DD; requires --end-date')
+    parser.add_argument('--end-date', help='YYYY-MM-DD; requires --start-date')
+    parser.add_argument('--max-workers', type=int, default=DEFAULT_MAX_WORKERS, help='concurrent detail requests')
+    args = parser.parse_args()
+
     load_dotenv()
     api_key = os.getenv("TVFY_API_KEY")
-    fetch_divisions(api_key)
\ No newline at end of file
+    fetch_divisions(api_key, args.start_date, args.end_date, max_workers=args.max_workers)
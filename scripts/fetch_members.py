@@ -1,9 +1,13 @@
 import json
-import requests
 import os
+import argparse
 from dotenv import load_dotenv
 
-def fetch_members(api_key):
+from scripts.tvfy_client import DEFAULT_MAX_WORKERS, ConditionalCache, create_session, fetch_many, get_json
+
+CACHE_DIRECTORY = './data/parliament/cache/people'
+
+def fetch_members(api_key, max_workers=DEFAULT_MAX_WORKERS, cache_directory=CACHE_DIRECTORY):
     # OS setup
     directory = './data/parliament'
     senate_filename = f"{directory}/senate.json"
@@ -15,8 +19,8 @@ def fetch_members(api_key):
     existing_senate_members = {}
     existing_house_members = {}
     
-    url = f"https://theyvoteforyou.org.au/api/v1/people.json?key={api_key}"
-    response = requests.get(url)
+    session = create_session(max_workers=max_workers)
+    response = get_json(session, 'people.json', api_key)
 
     # Mapping dictionary for 'Effective Party' column.
     effective_party_map = {
@@ -63,14 +67,17 @@ def fetch_members(api_key):
         senate_members = []
         house_members = []
 
+        # Fetch additional info for every member concurrently, skipping unchanged records
+        member_ids = [member['id'] for member in fetched_members if 'id' in member]
+        additional_info, counts = fetch_additional_info_batch(session, member_ids, api_key, ConditionalCache(cache_directory), max_workers)
+        session.close()
+
         for member in fetched_members:
             member_id = member.get('id', 'unknown_id')
             
-            # Fetch additional info
-            additional_info = fetch_additional_info(member_id, api_key)
             # If additional info is fetched, update the member dictionary
-            if additional_info:
-                member['additional_info'] = additional_info
+            if additional_info.get(member_id):
+                member['additional_info'] = additional_info[member_id]
             
             # Flatten and filter member information
             flat_member = flatten_member_info(member)
@@ -80,6 +87,8 @@ def fetch_members(api_key):
                 senate_members.append(flat_member)
             elif house == 'representatives':
                 house_members.append(flat_member)
+
+        print(f"Members: {counts['fetched']} fetched, {counts['unchanged']} unchanged, {counts['failed']} failed")
         
         # Save to files
         if senate_members:
@@ -94,21 +103,35 @@ def fetch_members(api_key):
 
     else:
         # Handle the failure case
+        session.close()
         return None, None
     
-def fetch_additional_info(member_id, api_key):
-    url = f"https://theyvoteforyou.org.au/api/v1/people/{member_id}.json?key={api_key}"
-    response = requests.get(url)
-    
-    if response.status_code == 200:
-        return response.json()
-    else:
-        return None
+def fetch_additional_info_batch(session, member_ids, api_key, cache, max_workers=DEFAULT_MAX_WORKERS):
+    # Conditional GETs against the cached ETag/Last-Modified; a 304 reuses the cached body
+    def fetch_one(member_id):
+        entry = cache.load(member_id)
+        response = get_json(session, f'people/{member_id}.json', api_key, headers=cache.headers(entry))
+
+        if response.status_code == 304 and entry is not None:
+            return (entry['body'], 'unchanged'), 0
+        if response.status_code == 200:
+            return (cache.save(member_id, response), 'fetched'), len(response.content)
+        return None, 0
 
+    results, report = fetch_many(member_ids, fetch_one, max_workers=max_workers, label='member details')
+
+    counts = {'fetched': 0, 'unchanged': 0, 'failed': report.failed}
+    for _, status in results.values():
+        counts[status] += 1
+    return {member_id: info for member_id, (info, _) in results.items()}, counts
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Fetch current members from They Vote For You')
+    parser.add_argument('--max-workers', type=int, default=DEFAULT_MAX_WORKERS, help='concurrent member requests')
+    args = parser.parse_args()
+
     load_dotenv()
     api_key = os.getenv("TVFY_API_KEY")
 
-    fetch_members(api_key)
+    fetch_members(api_key, max_workers=args.max_workers)
@@ -0,0 +1,266 @@
+import os
+import time
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+from scripts.division_categories import CATEGORIES, division_category
+from scripts.division_store import open_store
+from scripts.matrix_file import MatrixFile, write_matrix_file
+from scripts.vote_matrix import AYE, NO, load_vote_matrix, vote_code, voter_id
+
+# Pairwise voting agreement between members of one house, computed from the vote matrix with
+# matrix products over one-hot encodings of the aye and no votes:
+#
+#   agreement[i, j]     divisions where i and j both voted and voted the same way
+#   co_attendance[i, j] divisions where i and j both voted
+#   rates[i, j]         agreement / co_attendance (0 where they never sat together)
+#
+# The diagonal holds each member's own attendance (and a rate of 1).
+#   python -m scripts.interaction_matrix build --house senate --start-date 2022-07-26 --category Bills
+#
+# The raw counts are saved with a watermark (the last division store sequence number folded in)
+# and the ids of the divisions counted, so `update` can add newly fetched divisions as a rank-k
+# update instead of recomputing the whole history:
+#   python -m scripts.interaction_matrix update
+#
+# Each house is one memory-mappable file, data/parliament/interaction/<house>.matrix (see
+# scripts/matrix_file.py): float32 rates, uint16 counts, the member and division id indexes and
+# the filters/watermark as metadata. The app reads rows through load_interaction_matrix().
+# senate_legacy.matrix is the old notebook's Senate matrix, converted once and committed (keyed by
+# per-term member id, metadata id_kind 'member'); its JSON sources are gone, so it isn't rebuilt.
+
+HOUSES = ['senate', 'representatives']
+DEFAULT_DIRECTORY = './data/parliament/interaction'
+
+
+def one_hot(votes):
+    # float32 keeps counts exact up to 2**24 divisions and hits the BLAS fast path
+    ayes = (votes == AYE).astype(np.float32)
+    noes = (votes == NO).astype(np.float32)
+    return ayes, noes
+
+
+def count_interactions(votes):
+    # votes is int8 [members x divisions]; returns (agreement, co_attendance) as int64
+    ayes, noes = one_hot(votes)
+    present = ayes + noes
+    agreement = ayes @ ayes.T + noes @ noes.T
+    co_attendance = present @ present.T
+    return agreement.astype(np.int64), co_attendance.astype(np.int64)
+
+
+def agreement_rates(agreement, co_attendance):
+    rates = np.zeros(agreement.shape, dtype=np.float32)
+    np.divide(agreement, co_attendance, out=rates, where=co_attendance > 0, casting='unsafe')
+    return rates
+
+
+def compute_interactions(vote_matrix, house, start_date=None, end_date=None, category=None):
+    division_mask = vote_matrix.division_mask(house, start_date, end_date, category)
+    votes = np.asarray(vote_matrix.votes[:, division_mask])
+
+    # Current members of the house plus anyone who voted in the selected divisions
+    member_mask = vote_matrix.member_mask(house) | (votes != 0).any(axis=1)
+    votes = votes[member_mask]
+
+    agreement, co_attendance = count_interactions(votes)
+    return {
+        'member_ids': vote_matrix.member_ids[member_mask],
+        'division_ids': vote_matrix.division_ids[division_mask],
+        'agreement': agreement,
+        'co_attendance': co_attendance,
+        'rates': agreement_rates(agreement, co_attendance),
+        'metadata': {
+            'house': house,
+            'start_date': start_date,
+            'end_date': end_date,
+            'category': category,
+            'divisions': int(division_mask.sum()),
+            'watermark': vote_matrix.metadata.get('store_seq', -1),
+            'built_at': datetime.now().isoformat(timespec='seconds'),
+        },
+    }
+
+
+def matches_filters(entry, metadata):
+    # Whether a division store index entry falls inside the filters the matrix was built with
+    if entry.get('house') != metadata['house']:
+        return False
+    if metadata.get('start_date') and (entry.get('date') or '') < metadata['start_date']:
+        return False
+    if metadata.get('end_date') and (entry.get('date') or '') > metadata['end_date']:
+        return False
+    if metadata.get('category') and division_category(entry.get('name')) != metadata['category']:
+        return False
+    return True
+
+
+def update_interactions(interactions, store, index=None):
+    # Fold divisions appended to the store since the watermark into the stored counts.
+    # Only the new divisions' votes are read; the cost is O(k) divisions plus an O(N^2) add.
+    metadata = dict(interactions['metadata'])
+    index = index if index is not None else store.read_index()
+    watermark = metadata.get('watermark', -1)
+    included = set(interactions['division_ids'].tolist())
+
+    new_entries = {
+        division_id: entry for division_id, entry in index.items()
+        if entry['seq'] > watermark and division_id not in included and matches_filters(entry, metadata)
+    }
+    metadata['watermark'] = max([watermark] + [entry['seq'] for entry in index.values()])
+    metadata['updated_at'] = datetime.now().isoformat(timespec='seconds')
+
+    if not new_entries:
+        return dict(interactions, metadata=metadata), 0
+
+    voters, columns, codes = [], [], []
+    for column, division in enumerate(store.iter_divisions(new_entries)):
+        for vote_entry in division.get('votes', []):
+            voters.append(voter_id(vote_entry))
+            columns.append(column)
+            codes.append(vote_code(vote_entry))
+
+    # Grow the member axis for anyone new, keeping it sorted
+    voters = np.array(voters, dtype=np.int64)
+    member_ids = np.union1d(interactions['member_ids'], voters)
+    old = np.searchsorted(member_ids, interactions['member_ids'])
+
+    agreement = np.zeros((len(member_ids), len(member_ids)), dtype=np.int64)
+    co_attendance = np.zeros_like(agreement)
+    agreement[np.ix_(old, old)] = interactions['agreement']
+    co_attendance[np.ix_(old, old)] = interactions['co_attendance']
+
+    votes = np.zeros((len(member_ids), len(new_entries)), dtype=np.int8)
+    votes[np.searchsorted(member_ids, voters), columns] = codes
+    new_agreement, new_co_attendance = count_interactions(votes)
+    agreement += new_agreement
+    co_attendance += new_co_attendance
+
+    metadata['divisions'] = metadata.get('divisions', 0) + len(new_entries)
+    updated = {
+        'member_ids': member_ids,
+        'division_ids': np.concatenate([interactions['division_ids'], np.fromiter(new_entries, dtype=np.int64)]),
+        'agreement': agreement,
+        'co_attendance': co_attendance,
+        'rates': agreement_rates(agreement, co_attendance),
+        'metadata': metadata,
+    }
+    return updated, len(new_entries)
+
+
+def empty_interactions(house):
+    return {
+        'member_ids': np.zeros(0, dtype=np.int64),
+        'division_ids': np.zeros(0, dtype=np.int64),
+        'agreement': np.zeros((0, 0), dtype=np.int64),
+        'co_attendance': np.zeros((0, 0), dtype=np.int64),
+        'rates': np.zeros((0, 0), dtype=np.float32),
+        'metadata': {'house': house, 'start_date': None, 'end_date': None, 'category': None, 'divisions': 0, 'watermark': -1},
+    }
+
+
+def interaction_filename(house, directory=DEFAULT_DIRECTORY):
+    return os.path.join(directory, f"{house}.matrix")
+
+
+def count_dtype(counts):
+    # Counts fit in uint16 for any single term; long multi-term histories fall back to uint32
+    return np.uint16 if counts.size == 0 or counts.max() <= np.iinfo(np.uint16).max else np.uint32
+
+
+def save_interactions(interactions, filename):
+    # One binary file (see scripts/matrix_file.py) with the payload, the id index and provenance
+    write_matrix_file(filename, {
+        'member_ids': interactions['member_ids'].astype(np.int64),
+        'division_ids': interactions['division_ids'].astype(np.int64),
+        'rates': interactions['rates'].astype(np.float32),
+        'agreement': interactions['agreement'].astype(count_dtype(interactions['agreement'])),
+        'co_attendance': interactions['co_attendance'].astype(count_dtype(interactions['co_attendance'])),
+    }, interactions['metadata'])
+
+
+def load_interactions(filename):
+    # Fully in-memory copy with int64 counts, ready to be updated
+    matrix_file = MatrixFile(filename)
+    interactions = {name: np.array(matrix_file[name]) for name in ['member_ids', 'division_ids', 'rates']}
+    for name in ['agreement', 'co_attendance']:
+        interactions[name] = np.array(matrix_file[name], dtype=np.int64)
+    interactions['metadata'] = dict(matrix_file.metadata)
+    return interactions
+
+
+class InteractionMatrix:
+    # Read-only, memory-mapped view for the app: rows are looked up by member id
+    def __init__(self, filename):
+        self.file = MatrixFile(filename)
+        self.metadata = self.file.metadata
+        self.member_ids = np.array(self.file['member_ids'])
+
+    def index(self, member_id):
+        i = int(np.searchsorted(self.member_ids, member_id))
+        if i == len(self.member_ids) or self.member_ids[i] != member_id:
+            raise KeyError(member_id)
+        return i
+
+    def __contains__(self, member_id):
+        try:
+            self.index(member_id)
+        except KeyError:
+            return False
+        return True
+
+    def row(self, member_id, kind='rates'):
+        # kind is 'rates', 'agreement' or 'co_attendance'; aligned with member_ids
+        return self.file[kind][self.index(member_id)]
+
+    def matrix(self, kind='rates'):
+        return self.file[kind]
+
+
+def load_interaction_matrix(house, directory=DEFAULT_DIRECTORY):
+    filename = interaction_filename(house, directory)
+    if not os.path.exists(filename):
+        return None
+    return InteractionMatrix(filename)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compute member agreement matrices from the vote matrix')
+    parser.add_argument('command', nargs='?', choices=['build', 'update'], default='build',
+                        help='build from the vote matrix, or fold newly stored divisions into the saved counts')
+    parser.add_argument('--house', choices=HOUSES + ['both'], default='both')
+    parser.add_argument('--start-date', help='YYYY-MM-DD (build only)')
+    parser.add_argument('--end-date', help='YYYY-MM-DD (build only)')
+    parser.add_argument('--category', choices=CATEGORIES, help='build only')
+    parser.add_argument('--directory', default=DEFAULT_DIRECTORY)
+    args = parser.parse_args()
+
+    houses = HOUSES if args.house == 'both' else [args.house]
+
+    if args.command == 'update':
+        store = open_store()
+        index = store.read_index()
+        for house in houses:
+            filename = interaction_filename(house, args.directory)
+            started = time.perf_counter()
+            interactions = load_interactions(filename) if os.path.exists(filename) else empty_interactions(house)
+            interactions, added = update_interactions(interactions, store, index)
+            save_interactions(interactions, filename)
+            print(f"{house}: added {added} divisions in {(time.perf_counter() - started) * 1000:.0f} ms "
+                  f"(watermark {interactions['metadata']['watermark']}) -> {filename}")
+    else:
+        vote_matrix = load_vote_matrix()
+        if vote_matrix is None:
+            raise SystemExit("No vote matrix found; run python -m scripts.vote_matrix build first")
+
+        for house in houses:
+            started = time.perf_counter()
+            interactions = compute_interactions(vote_matrix, house, args.start_date, args.end_date, args.category)
+            elapsed = time.perf_counter() - started
+
+            filename = interaction_filename(house, args.directory)
+            save_interactions(interactions, filename)
+            print(f"{house}: {len(interactions['member_ids'])} members over {interactions['metadata']['divisions']} divisions "
+                  f"in {elapsed * 1000:.0f} ms -> {filename}")
@@ -0,0 +1,85 @@
+import os
+import json
+
+import numpy as np
+
+# A single self-describing binary file holding several named arrays plus metadata, laid out so
+# every array can be memory-mapped in place:
+#
+#   8 bytes   magic b'PARLMTX\0'
+#   4 bytes   format version (little-endian uint32)
+#   4 bytes   header length (little-endian uint32)
+#   header    UTF-8 JSON: {"arrays": {name: {"dtype", "shape", "offset"}}, "metadata": {...}}
+#   payload   starts on the next 64-byte boundary; each array's raw C-order bytes sit at
+#             payload start + offset, also 64-byte aligned
+#
+# Opening a file only parses the header; arrays are mapped the first time they're asked for.
+
+MAGIC = b'PARLMTX\0'
+VERSION = 1
+ALIGNMENT = 64
+PREAMBLE_BYTES = len(MAGIC) + 8
+
+
+def align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_matrix_file(filename, arrays, metadata=None):
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+
+    # Offsets are relative to the start of the payload, which follows the header
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset = align(offset + array.nbytes)
+
+    header = json.dumps({'arrays': layout, 'metadata': metadata or {}}).encode('utf-8')
+    payload_start = align(PREAMBLE_BYTES + len(header))
+
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+    temporary = filename + '.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(MAGIC)
+        f.write(np.array([VERSION, len(header)], dtype='<u4').tobytes())
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(payload_start + layout[name]['offset'])
+            f.write(array.tobytes())
+        f.truncate(payload_start + offset)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, filename)
+
+
+class MatrixFile:
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{filename} is not a matrix file")
+            version, header_length = np.frombuffer(f.read(8), dtype='<u4')
+            if version != VERSION:
+                raise ValueError(f"{filename} has unsupported format version {version}")
+            header = json.loads(f.read(int(header_length)))
+        self.payload_start = align(PREAMBLE_BYTES + int(header_length))
+        self.layout = header['arrays']
+        self.metadata = header['metadata']
+        self._arrays = {}
+
+    def names(self):
+        return list(self.layout)
+
+    def __contains__(self, name):
+        return name in self.layout
+
+    def __getitem__(self, name):
+        # Map lazily and keep the read-only view around
+        if name not in self._arrays:
+            spec = self.layout[name]
+            shape = tuple(spec['shape'])
+            if 0 in shape:
+                self._arrays[name] = np.zeros(shape, dtype=spec['dtype'])
+            else:
+                self._arrays[name] = np.memmap(self.filename, dtype=spec['dtype'], mode='r', offset=self.payload_start + spec['offset'], shape=shape)
+        return self._arrays[name]
@@ -0,0 +1,64 @@
+import numpy as np
+
+# Members' votes side by side across the divisions of one category, as the backends return it:
+#
+#   division_ids    [D]     division ids (ints for SQLite, UUIDs for EdgeDB), in id order
+#   division_names  [D]     division names
+#   member_names    [M]     the selected members, in the order asked for
+#   codes           [D, M]  int8: 1 aye, -1 no, 0 did not vote
+#
+# Only divisions where at least one selected member voted are included. Backends page through a
+# category with keyset pagination: pass the last division id of a page as `after` for the next.
+
+VOTE_CODES = {'aye': 1, 'no': -1}
+CODE_LABELS = {1: 'aye', -1: 'no'}
+DEFAULT_PAGE_SIZE = 250
+
+
+def empty_comparison(member_names):
+    return {
+        'division_ids': [],
+        'division_names': [],
+        'member_names': list(member_names),
+        'codes': np.zeros((0, len(member_names)), dtype=np.int8),
+    }
+
+
+def comparison_from_votes(member_names, divisions):
+    # divisions: (division_id, division_name, [(member_name, vote), ...]) as fetched per division
+    columns = {name: position for position, name in enumerate(member_names)}
+    codes = np.zeros((len(divisions), len(member_names)), dtype=np.int8)
+    for row, (_, _, votes) in enumerate(divisions):
+        for member_name, vote in votes:
+            codes[row, columns[member_name]] = VOTE_CODES.get(vote, 0)
+    return {
+        'division_ids': [division_id for division_id, _, _ in divisions],
+        'division_names': [division_name for _, division_name, _ in divisions],
+        'member_names': list(member_names),
+        'codes': codes,
+    }
+
+
+def concat_comparisons(pages):
+    pages = list(pages)
+    return {
+        'division_ids': [division_id for page in pages for division_id in page['division_ids']],
+        'division_names': [name for page in pages for name in page['division_names']],
+        'member_names': pages[0]['member_names'],
+        'codes': np.concatenate([page['codes'] for page in pages]),
+    }
+
+
+def last_division_id(comparison):
+    return comparison['division_ids'][-1] if len(comparison['division_ids']) else None
+
+
+def comparison_frame(comparison):
+    # The table the page shows: one row per division, one column per member, 'aye'/'no'/blank
+    import pandas as pd
+
+    labels = np.full(comparison['codes'].shape, None, dtype=object)
+    for code, label in CODE_LABELS.items():
+        labels[comparison['codes'] == code] = label
+    return pd.DataFrame(labels, index=pd.Index(comparison['division_names'], name='division_name'),
+                        columns=pd.Index(comparison['member_names'], name='member_name'))
@@ -0,0 +1,67 @@
+import os
+import json
+
+import numpy as np
+import pandas as pd
+
+from scripts.vote_matrix import voter_id
+
+# Member tables keyed by the numeric person id, and the per-division vote table joined onto them.
+# Votes are matched to members by id (member.person.id in the vote records), never by name.
+
+MEMBER_COLUMNS = ['First Name', 'Last Name', 'Electorate', 'Party', 'Effective Party', 'Color']
+VOTE_COLUMNS = MEMBER_COLUMNS + ['Vote']
+HOUSE_FILENAMES = {
+    'senate': './data/parliament/senate.json',
+    'representatives': './data/parliament/house.json',
+}
+
+
+def load_members(house):
+    filename = HOUSE_FILENAMES[house]
+    if not os.path.exists(filename):
+        return None
+    with open(filename, 'r') as f:
+        return json.load(f)
+
+
+def effective_party(member):
+    # The party a member's votes are grouped under: independents stand as themselves
+    party = member.get('effective_party', member['party'])  # Use 'party' as a fallback
+    if party == 'Independent':
+        party = member['name'] if ' ' in member['name'] else None
+    return party if party is not None else 'Unknown'
+
+
+def build_member_table(members):
+    # One row per member of a house, indexed by id
+    ids = [int(member['id']) for member in members]
+    names = pd.Series([member['name'] for member in members], dtype=object).str.split(' ', n=1, expand=True)
+    names = names.reindex(columns=[0, 1])
+
+    table = pd.DataFrame({
+        'First Name': names[0].to_numpy(),
+        'Last Name': names[1].to_numpy(),
+        'Electorate': [member.get('electorate', 'N/A') for member in members],
+        'Party': [member['party'] for member in members],
+        'Effective Party': [effective_party(member) for member in members],
+        'Color': [member.get('color', 'gray') for member in members],  # Default to gray if color is not provided
+    }, index=pd.Index(ids, name='id', dtype=np.int64))
+    return table
+
+
+def division_vote_table(member_table, division):
+    # Join one division's votes onto the member table by id; members without a vote are Absent
+    votes = [vote_entry for vote_entry in division.get('votes', []) if 'member' in vote_entry]
+    voter_ids = np.fromiter((voter_id(vote_entry) for vote_entry in votes), dtype=np.int64, count=len(votes))
+    ayes = np.fromiter((vote_entry['vote'] == 'aye' for vote_entry in votes), dtype=bool, count=len(votes))
+
+    rows = member_table.index.get_indexer(voter_ids)
+    found = rows >= 0
+
+    vote = np.full(len(member_table), 'Absent', dtype=object)
+    vote[rows[found]] = np.where(ayes[found], 'Yes', 'No')
+
+    table = member_table.reset_index(drop=True)
+    table['Vote'] = vote
+    return table
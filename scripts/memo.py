@@ -0,0 +1,130 @@
+import os
+import sys
+import threading
+import functools
+from collections import OrderedDict
+
+# A process-wide, bounded LRU memo for the app's per-division views. Keys are cheap identifiers
+# (view name, division id, house, ...) rather than hashes of whole arguments, and every lookup
+# carries the data version: when it changes after a refresh, everything cached is dropped.
+#
+# Caps come from the environment:
+#   MEMO_MAX_ENTRIES   most entries kept (default 512)
+#   MEMO_MAX_BYTES     approximate memory budget in bytes (default 64 MiB)
+#
+# Values are shared between sessions, so callers must treat them as read-only.
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def estimate_size(value, seen=None):
+    # Rough deep size: DataFrames and arrays report their own, figures are sized as their dict
+    seen = seen if seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if hasattr(value, 'memory_usage'):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    if hasattr(value, 'to_plotly_json'):
+        return estimate_size(value.to_plotly_json(), seen)
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k, seen) + estimate_size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, seen) for item in value)
+    return size
+
+
+class Memo:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, sizeof=estimate_size):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self, version):
+        if version != self.version:
+            if self.entries:
+                self.invalidations += 1
+            self.entries.clear()
+            self.bytes = 0
+            self.version = version
+
+    def get(self, key, version, compute):
+        with self.lock:
+            self._check_version(version)
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key][0]
+            self.misses += 1
+
+        # Computed outside the lock; two sessions missing the same key at once both compute it
+        value = compute()
+        size = self.sizeof(value)
+
+        with self.lock:
+            if version != self.version or size > self.max_bytes:
+                return value
+            if key in self.entries:
+                self.bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (value, size)
+            self.bytes += size
+
+            # Evict least recently used entries until back under both caps
+            while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+def memo_from_env():
+    return Memo(
+        max_entries=int(os.getenv('MEMO_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)),
+        max_bytes=int(os.getenv('MEMO_MAX_BYTES', DEFAULT_MAX_BYTES)),
+    )
+
+
+MEMO = memo_from_env()
+
+
+def memoize(view, memo=None):
+    # Positional arguments form the key (so keep them small: ids, house, view names);
+    # version is keyword-only and invalidates the memo when it changes
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*key, version):
+            return (memo or MEMO).get((view,) + key, version, lambda: function(*key, version=version))
+        return wrapper
+    return decorator
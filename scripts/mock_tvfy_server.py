@@ -0,0 +1,214 @@
+import re
+import json
+import hashlib
+import time
+import random
+import argparse
+import threading
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# A local stand-in for the They Vote For You API, for exercising the fetch scripts offline.
+# Run it, then point the scripts at it:
+#   python -m scripts.mock_tvfy_server --port 8765 &
+#   TVFY_BASE_URL=http://127.0.0.1:8765/api/v1 python -m scripts.fetch_divisions
+
+PAGE_SIZE = 100
+FAILURE_STATUSES = [429, 503, 500]
+SUMMARY_FIELDS = ['id', 'house', 'name', 'date', 'number', 'clock_time', 'aye_votes', 'no_votes', 'possible_turnout', 'rebellions', 'edited']
+
+
+def person_record(member, member_id):
+    first_name, last_name = member['name'].split(' ', 1)
+    return {
+        'id': member['id'],
+        'latest_member': {
+            'id': member_id,
+            'name': {'first': first_name, 'last': last_name},
+            'electorate': member['electorate'],
+            'house': member['house'],
+            'party': member['party'],
+        },
+    }
+
+
+def person_record_summary(person):
+    return {'id': person['id'], 'latest_member': person['latest_member']}
+
+
+def build_fixture(members, num_divisions=200, seed=0, start=date(2022, 7, 26)):
+    # Build people and division details shaped like the real API from flattened member records
+    rng = random.Random(seed)
+    people = {}
+    for member_id, member in enumerate(members, start=100000):
+        person = person_record(member, member_id)
+        person.update({
+            'rebellions': member.get('rebellions') or 0,
+            'votes_attended': member.get('votes_attended') or 0,
+            'votes_possible': member.get('votes_possible') or 0,
+            'offices': [{'position': office} for office in member.get('offices', [])],
+        })
+        people[member['id']] = person
+
+    by_house = {}
+    for person in people.values():
+        by_house.setdefault(person['latest_member']['house'], []).append(person)
+
+    divisions = {}
+    for division_id in range(1, num_divisions + 1):
+        house = rng.choice(sorted(by_house))
+        votes = []
+        for person in by_house[house]:
+            if rng.random() < 0.3:
+                continue  # absent
+            latest = person['latest_member']
+            votes.append({
+                'vote': rng.choice(['aye', 'no']),
+                'member': {
+                    'id': latest['id'],
+                    'person': {'id': person['id']},
+                    'first_name': latest['name']['first'],
+                    'last_name': latest['name']['last'],
+                    'electorate': latest['electorate'],
+                    'house': house,
+                    'party': latest['party'],
+                },
+            })
+        divisions[division_id] = {
+            'id': division_id,
+            'house': house,
+            'name': f"Motions - Synthetic motion {division_id}",
+            'date': (start + timedelta(days=division_id // 4)).isoformat(),
+            'number': division_id,
+            'clock_time': None,
+            'aye_votes': sum(1 for vote in votes if vote['vote'] == 'aye'),
+            'no_votes': sum(1 for vote in votes if vote['vote'] == 'no'),
+            'possible_turnout': len(by_house[house]),
+            'rebellions': 0,
+            'edited': False,
+            'summary': f"Synthetic division {division_id}.",
+            'votes': votes,
+            'bills': [],
+            'policy_divisions': [],
+        }
+
+    return {'people': people, 'divisions': divisions}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    # Set on the server instance: fixture, latency (seconds), fail_rate (0..1), fail_first (the
+    # first n requests for each path fail, in turn 429, 503, 500), request counter
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+
+        # Honour conditional requests the way the real API's ETag handling does
+        if status == 200 and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+            attempt = server.attempts.get(self.path, 0)
+            server.attempts[self.path] = attempt + 1
+
+        if server.latency:
+            time.sleep(server.latency)
+        failure = None
+        if attempt < server.fail_first:
+            failure = FAILURE_STATUSES[attempt % len(FAILURE_STATUSES)]
+        elif server.fail_rate and random.random() < server.fail_rate:
+            failure = random.choice([429, 503])
+        if failure:
+            self.send_response(failure)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        fixture = server.fixture
+
+        if url.path == '/api/v1/divisions.json':
+            divisions = sorted(fixture['divisions'].values(), key=lambda d: (d['date'], d['id']), reverse=True)
+            if 'start_date' in query and 'end_date' in query:
+                start_date, end_date = query['start_date'][0], query['end_date'][0]
+                divisions = [d for d in divisions if start_date <= d['date'] <= end_date]
+            self.send_json(200, [{k: d[k] for k in SUMMARY_FIELDS} for d in divisions[:PAGE_SIZE]])
+            return
+
+        if url.path == '/api/v1/people.json':
+            self.send_json(200, [person_record_summary(p) for p in fixture['people'].values()])
+            return
+
+        match = re.fullmatch(r'/api/v1/(divisions|people)/(\d+)\.json', url.path)
+        if match:
+            record = fixture[match.group(1)].get(int(match.group(2)))
+            if record is not None:
+                self.send_json(200, record)
+                return
+
+        self.send_json(404, {'error': 'not found'})
+
+
+def start_server(fixture, host='127.0.0.1', port=0, latency=0.0, fail_rate=0.0, fail_first=0):
+    # Start the server on a background thread; port=0 picks a free port (see server.server_address)
+    server = ThreadingHTTPServer((host, port), StandInHandler)
+    server.daemon_threads = True
+    server.fixture = fixture
+    server.latency = latency
+    server.fail_rate = fail_rate
+    server.fail_first = fail_first
+    server.request_count = 0
+    server.attempts = {}
+    server.lock = threading.Lock()
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def load_local_members(directory='./data/parliament'):
+    members = []
+    for filename in ['senate.json', 'house.json']:
+        with open(f"{directory}/{filename}", 'r') as f:
+            members.extend(json.load(f))
+    return members
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Serve a stand-in They Vote For You API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--divisions', type=int, default=200, help='number of synthetic divisions')
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds of delay per request')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='fraction of requests answered 429/503')
+    parser.add_argument('--fail-first', type=int, default=0, help='fail the first n requests for each path')
+    args = parser.parse_args()
+
+    fixture = build_fixture(load_local_members(), num_divisions=args.divisions)
+    server = start_server(fixture, args.host, args.port, args.latency, args.fail_rate, args.fail_first)
+    print(f"Serving stand-in API at http://{args.host}:{server.server_address[1]}/api/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,61 @@
+import os
+
+from scripts.division_catalog import catalog_division, index_signature, load_catalog
+from scripts.division_store import open_store
+from scripts.members import HOUSE_FILENAMES, build_member_table, load_members
+from scripts.party_breakdowns import breakdown_signature, load_party_breakdowns
+
+# Everything the app reads, loaded once per process and data version and shared read-only by
+# every session: the division catalog, one member table per house and the party breakdowns.
+# Division records themselves stay in the store and are read on demand by id.
+#
+# Callers must not mutate what they get back; build per-session tables from copies
+# (scripts.members.division_vote_table already does).
+
+
+def file_signature(filename):
+    if not os.path.exists(filename):
+        return None
+    stat = os.stat(filename)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def data_version(store=None):
+    # A few stat() calls; changes whenever a refresh rewrites any of the inputs
+    store = store or open_store()
+    signature = index_signature(store)
+    return (
+        tuple(signature) if signature else None,
+        breakdown_signature(),
+        tuple(file_signature(filename) for filename in HOUSE_FILENAMES.values()),
+    )
+
+
+class ParliamentData:
+    def __init__(self, version, store=None):
+        self.version = version
+        self.store = store or open_store()
+        self.catalog = load_catalog(self.store) if self.store.exists() else None
+        self.member_tables = {}
+        for house in HOUSE_FILENAMES:
+            members = load_members(house)
+            self.member_tables[house] = build_member_table(members) if members else None
+        self.breakdowns = load_party_breakdowns()
+
+    def loaded(self):
+        return self.catalog is not None and all(table is not None for table in self.member_tables.values())
+
+    def member_table(self, house):
+        return self.member_tables.get(house)
+
+    def division(self, division_id):
+        # O(1): the catalog holds each division's byte range in the store
+        if self.catalog is None:
+            return None
+        return catalog_division(self.store, self.catalog, division_id)
+
+    def party_votes(self, division_id):
+        # Precomputed party x vote tallies, or None for a division not in the breakdowns yet
+        if self.breakdowns is None or division_id not in self.breakdowns:
+            return None
+        return self.breakdowns.party_votes(division_id)
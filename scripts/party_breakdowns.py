@@ -0,0 +1,172 @@
+import os
+import argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from scripts.matrix_file import MatrixFile, write_matrix_file
+from scripts.members import HOUSE_FILENAMES, effective_party, load_members
+from scripts.vote_breakdown import REQUIRED_YES_VOTES, VOTE_TYPES
+from scripts.vote_matrix import AYE, NO, load_vote_matrix
+
+# Effective party x {Yes, No, Absent} tallies for every division, precomputed after each refresh
+# so the app looks a division's breakdown up instead of tallying raw votes per click.
+#
+# Stored as one matrix file (scripts/matrix_file.py) in a CSR-style layout keyed by division id:
+#
+#   division_ids   int64 [D], sorted
+#   offsets        int64 [D + 1]; division i's party rows are offsets[i]:offsets[i + 1]
+#   parties        uint16 [R], index into metadata['parties'] (sorted names, so rows are too)
+#   counts         uint16 [R x 3], columns VOTE_TYPES
+#   totals         uint16 [D x 3], the division's Yes/No/Absent totals
+#   passed         bool [D], Yes total reached REQUIRED_YES_VOTES
+#   margin         int32 [D], Yes total minus REQUIRED_YES_VOTES
+#
+# Members are the current senate.json/house.json members, grouped exactly as in the app.
+#   python -m scripts.party_breakdowns build
+
+DEFAULT_FILENAME = './data/parliament/party_breakdowns.matrix'
+
+
+def house_breakdowns(vote_matrix, members, party_codes, house):
+    # Tallies for every division of one house as matrix products over party membership
+    member_ids = np.array([int(member['id']) for member in members], dtype=np.int64)
+    member_parties = np.array([party_codes[effective_party(member)] for member in members], dtype=np.int64)
+    columns = np.flatnonzero(vote_matrix.division_houses == house)
+
+    # Members missing from the vote matrix have never voted: absent throughout
+    votes = np.zeros((len(member_ids), len(columns)), dtype=np.int8)
+    if len(vote_matrix.member_ids) and len(member_ids):
+        rows = np.searchsorted(vote_matrix.member_ids, member_ids).clip(max=len(vote_matrix.member_ids) - 1)
+        found = vote_matrix.member_ids[rows] == member_ids
+        votes[found] = np.asarray(vote_matrix.votes[rows[found]])[:, columns]
+
+    house_parties, member_party = np.unique(member_parties, return_inverse=True)
+    membership = np.zeros((len(house_parties), len(member_ids)), dtype=np.float32)
+    membership[member_party, np.arange(len(member_ids))] = 1
+
+    yes = membership @ (votes == AYE).astype(np.float32)
+    no = membership @ (votes == NO).astype(np.float32)
+    absent = membership.sum(axis=1, keepdims=True) - yes - no
+
+    # [divisions x parties x vote types]
+    counts = np.stack([yes.T, no.T, absent.T], axis=-1).astype(np.int64)
+    return vote_matrix.division_ids[columns], house_parties, counts
+
+
+def build_party_breakdowns(vote_matrix, members_by_house):
+    parties = sorted({effective_party(member) for members in members_by_house.values() for member in members})
+    party_codes = {party: code for code, party in enumerate(parties)}
+
+    division_ids, lengths, party_rows, count_rows = [], [], [], []
+    for house, members in members_by_house.items():
+        ids, house_parties, counts = house_breakdowns(vote_matrix, members, party_codes, house)
+        division_ids.append(ids)
+        lengths.append(np.full(len(ids), len(house_parties), dtype=np.int64))
+        party_rows.append(np.tile(house_parties, len(ids)))
+        count_rows.append(counts.reshape(-1, len(VOTE_TYPES)))
+
+    division_ids = np.concatenate(division_ids) if division_ids else np.zeros(0, dtype=np.int64)
+    lengths = np.concatenate(lengths) if lengths else np.zeros(0, dtype=np.int64)
+    party_rows = np.concatenate(party_rows) if party_rows else np.zeros(0, dtype=np.int64)
+    count_rows = np.concatenate(count_rows) if count_rows else np.zeros((0, len(VOTE_TYPES)), dtype=np.int64)
+
+    # Reorder the per-division row blocks by division id
+    order = np.argsort(division_ids, kind='stable')
+    starts = (np.cumsum(lengths) - lengths)[order]
+    ordered_lengths = lengths[order]
+    offsets = np.concatenate([[0], np.cumsum(ordered_lengths)])
+    rows = np.repeat(starts - offsets[:-1], ordered_lengths) + np.arange(offsets[-1])
+
+    counts = count_rows[rows]
+    totals = np.add.reduceat(counts, offsets[:-1], axis=0) if len(order) else np.zeros((0, len(VOTE_TYPES)), dtype=np.int64)
+    return {
+        'division_ids': division_ids[order],
+        'offsets': offsets.astype(np.int64),
+        'parties': party_rows[rows].astype(np.uint16),
+        'counts': counts.astype(np.uint16),
+        'totals': totals.astype(np.uint16),
+        'passed': totals[:, 0] >= REQUIRED_YES_VOTES,
+        'margin': (totals[:, 0] - REQUIRED_YES_VOTES).astype(np.int32),
+        'metadata': {
+            'parties': parties,
+            'vote_types': VOTE_TYPES,
+            'required_yes_votes': REQUIRED_YES_VOTES,
+            'store_seq': vote_matrix.metadata.get('store_seq', -1),
+            'built_at': datetime.now().isoformat(timespec='seconds'),
+        },
+    }
+
+
+def save_party_breakdowns(breakdowns, filename=DEFAULT_FILENAME):
+    arrays = {name: array for name, array in breakdowns.items() if name != 'metadata'}
+    write_matrix_file(filename, arrays, breakdowns['metadata'])
+
+
+def breakdown_signature(filename=DEFAULT_FILENAME):
+    if not os.path.exists(filename):
+        return None
+    stat = os.stat(filename)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+class PartyBreakdowns:
+    # Read-only, memory-mapped lookups by division id
+    def __init__(self, filename=DEFAULT_FILENAME):
+        self.file = MatrixFile(filename)
+        self.metadata = self.file.metadata
+        self.parties = self.metadata['parties']
+        self.division_ids = np.array(self.file['division_ids'])
+        self.offsets = np.array(self.file['offsets'])
+
+    def position(self, division_id):
+        i = int(np.searchsorted(self.division_ids, division_id))
+        if i == len(self.division_ids) or self.division_ids[i] != division_id:
+            raise KeyError(division_id)
+        return i
+
+    def __contains__(self, division_id):
+        try:
+            self.position(division_id)
+        except KeyError:
+            return False
+        return True
+
+    def party_votes(self, division_id):
+        # Same shape as scripts.vote_breakdown.aggregate_votes: parties x VOTE_TYPES
+        i = self.position(division_id)
+        start, end = self.offsets[i], self.offsets[i + 1]
+        index = pd.Index([self.parties[code] for code in self.file['parties'][start:end]], name='Effective Party')
+        return pd.DataFrame(np.asarray(self.file['counts'][start:end], dtype=np.int64), index=index, columns=VOTE_TYPES)
+
+    def result(self, division_id):
+        i = self.position(division_id)
+        totals = self.file['totals'][i]
+        return {
+            **{vote_type: int(total) for vote_type, total in zip(VOTE_TYPES, totals)},
+            'passed': bool(self.file['passed'][i]),
+            'margin': int(self.file['margin'][i]),
+        }
+
+
+def load_party_breakdowns(filename=DEFAULT_FILENAME):
+    if not os.path.exists(filename):
+        return None
+    return PartyBreakdowns(filename)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Precompute party vote breakdowns for every division')
+    parser.add_argument('command', choices=['build'])
+    parser.add_argument('--filename', default=DEFAULT_FILENAME)
+    args = parser.parse_args()
+
+    vote_matrix = load_vote_matrix()
+    if vote_matrix is None:
+        raise SystemExit("No vote matrix found; run python -m scripts.vote_matrix build first")
+
+    members_by_house = {house: members for house in HOUSE_FILENAMES if (members := load_members(house))}
+    breakdowns = build_party_breakdowns(vote_matrix, members_by_house)
+    save_party_breakdowns(breakdowns, args.filename)
+    print(f"Party breakdowns: {len(breakdowns['division_ids'])} divisions, {len(breakdowns['parties'])} rows -> {args.filename}")
@@ -0,0 +1,68 @@
+import time
+import threading
+from functools import wraps
+
+# Process-wide latency and row counts of the database queries behind pages/edgedb.py. Decorate a
+# query function with @timed('name') beneath its st.cache_* decorator, so only calls that reach
+# the database are counted; SHOW_QUERY_TIMINGS=1 shows the table in the page's sidebar.
+
+
+class QueryTimings:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queries = {}
+
+    def record(self, name, seconds, rows):
+        with self.lock:
+            entry = self.queries.setdefault(name, {'calls': 0, 'rows': 0, 'total_seconds': 0.0, 'max_seconds': 0.0, 'last_seconds': 0.0})
+            entry['calls'] += 1
+            entry['rows'] += rows
+            entry['total_seconds'] += seconds
+            entry['max_seconds'] = max(entry['max_seconds'], seconds)
+            entry['last_seconds'] = seconds
+
+    def stats(self):
+        # One row per query, slowest in total first
+        with self.lock:
+            rows = [
+                {
+                    'query': name,
+                    'calls': entry['calls'],
+                    'rows': entry['rows'],
+                    'total_ms': entry['total_seconds'] * 1000,
+                    'mean_ms': entry['total_seconds'] * 1000 / entry['calls'],
+                    'max_ms': entry['max_seconds'] * 1000,
+                    'last_ms': entry['last_seconds'] * 1000,
+                }
+                for name, entry in self.queries.items()
+            ]
+        return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+    def clear(self):
+        with self.lock:
+            self.queries.clear()
+
+
+QUERY_TIMINGS = QueryTimings()
+
+
+def row_count(result):
+    try:
+        return len(result)
+    except TypeError:
+        return 0 if result is None else 1
+
+
+def timed(name, rows=row_count, timings=None):
+    # rows counts the result's rows, for results that aren't a sequence of them
+    timings = timings or QUERY_TIMINGS
+
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            result = function(*args, **kwargs)
+            timings.record(name, time.perf_counter() - started, rows(result))
+            return result
+        return wrapper
+    return decorator
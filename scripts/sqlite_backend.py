@@ -0,0 +1,325 @@
+import os
+import csv
+import json
+import time
+import sqlite3
+import argparse
+
+from scripts.division_categories import division_category
+from scripts.division_store import open_store
+from scripts.member_comparison import empty_comparison
+from scripts.vote_matrix import voter_id
+
+# An embedded SQLite mirror of the EdgeDB parliament schema, so pages/edgedb.py can run offline:
+#
+#   parliament::Member     member (person id, full_name, house, party)
+#   parliament::Party      party
+#   parliament::Electorate electorate (+ member_electorate)
+#   parliament::Suburb     suburb (+ electorate_suburb)
+#   parliament::Division   division (with division_category from scripts/division_categories.py)
+#   parliament::Vote       vote (division, member, 'aye'/'no')
+#
+# Load it from the local JSON store (members from senate.json/house.json, divisions from the
+# division store) in batched transactions; suburbs/postcodes come from an optional CSV with
+# suburb, postcode, state and electorate columns (e.g. an AEC electorate finder export):
+#   python -m scripts.sqlite_backend load --suburbs suburbs.csv
+# Then run the page against it with PARLIAMENT_BACKEND=sqlite.
+
+DEFAULT_DATABASE = './data/parliament/parliament.sqlite'
+MEMBER_FILENAMES = ['./data/parliament/senate.json', './data/parliament/house.json']
+BATCH_SIZE = 500
+
+# Senators' electorates are their states, named as in senate.json
+STATE_ELECTORATES = {
+    'NSW': 'NSW', 'VIC': 'Victoria', 'QLD': 'Queensland', 'WA': 'WA',
+    'SA': 'SA', 'TAS': 'Tasmania', 'ACT': 'ACT', 'NT': 'NT',
+}
+
+SCHEMA = """
+create table party (
+    id integer primary key,
+    name text not null unique
+);
+create table electorate (
+    id integer primary key,
+    name text not null,
+    house text not null,
+    unique (name, house)
+);
+create table suburb (
+    id integer primary key,
+    name text not null,
+    postcode text not null,
+    unique (name, postcode)
+);
+create table electorate_suburb (
+    electorate_id integer not null references electorate (id),
+    suburb_id integer not null references suburb (id),
+    primary key (electorate_id, suburb_id)
+) without rowid;
+create table member (
+    id integer primary key,
+    full_name text not null,
+    house text not null,
+    party_id integer references party (id)
+);
+create table member_electorate (
+    member_id integer not null references member (id),
+    electorate_id integer not null references electorate (id),
+    primary key (member_id, electorate_id)
+) without rowid;
+create table division (
+    id integer primary key,
+    name text not null,
+    house text not null,
+    date text,
+    number integer,
+    summary text,
+    division_category text
+);
+create table vote (
+    division_id integer not null references division (id),
+    member_id integer not null references member (id),
+    vote text not null check (vote in ('aye', 'no')),
+    primary key (division_id, member_id)
+) without rowid;
+"""
+
+# Built after the bulk load, which is faster than maintaining them row by row
+INDEXES = """
+create index vote_member on vote (member_id, division_id, vote);
+create index division_category_index on division (division_category, id);
+create index member_full_name on member (full_name);
+create index suburb_postcode on suburb (postcode);
+create index electorate_suburb_suburb on electorate_suburb (suburb_id);
+create index member_electorate_electorate on member_electorate (electorate_id);
+"""
+
+
+def connect(database=DEFAULT_DATABASE):
+    # Read-only and shareable between Streamlit's script threads
+    connection = sqlite3.connect(f"file:{database}?mode=ro", uri=True, check_same_thread=False)
+    connection.execute('pragma query_only = on')
+    return connection
+
+
+def get_or_create(connection, cache, table, values):
+    # Small lookup tables (party, electorate, suburb): id by natural key, memoised in cache
+    if values not in cache:
+        columns = ', '.join(values_columns(table))
+        placeholders = ', '.join('?' for _ in values)
+        cursor = connection.execute(f"insert into {table} ({columns}) values ({placeholders})", values)
+        cache[values] = cursor.lastrowid
+    return cache[values]
+
+
+def values_columns(table):
+    return {'party': ['name'], 'electorate': ['name', 'house'], 'suburb': ['name', 'postcode']}[table]
+
+
+def load_members(connection, cache, member_filenames=MEMBER_FILENAMES):
+    count = 0
+    for filename in member_filenames:
+        if not os.path.exists(filename):
+            continue
+        with open(filename, 'r') as f:
+            members = json.load(f)
+        with connection:
+            for member in members:
+                party_id = get_or_create(connection, cache['party'], 'party', (member['party'],))
+                electorate_id = get_or_create(connection, cache['electorate'], 'electorate', (member['electorate'], member['house']))
+                connection.execute("insert into member (id, full_name, house, party_id) values (?, ?, ?, ?)",
+                                   (int(member['id']), member['name'], member['house'], party_id))
+                connection.execute("insert into member_electorate values (?, ?)", (int(member['id']), electorate_id))
+                cache['member'].add(int(member['id']))
+                count += 1
+    return count
+
+
+def load_divisions(connection, cache, store, batch_size=BATCH_SIZE):
+    # Streams the store; each batch of divisions (and their votes) is one transaction
+    divisions, votes, count = [], [], 0
+
+    def flush():
+        with connection:
+            connection.executemany("insert or replace into division values (?, ?, ?, ?, ?, ?, ?)", divisions)
+            connection.executemany("insert or replace into vote values (?, ?, ?)", votes)
+        divisions.clear()
+        votes.clear()
+
+    for division in store.iter_divisions():
+        divisions.append((
+            int(division['id']),
+            division.get('name') or '',
+            division.get('house') or '',
+            division.get('date'),
+            division.get('number'),
+            division.get('summary'),
+            division_category(division.get('name')) or None,  # unrecognised names stay uncategorised
+        ))
+        for vote_entry in division.get('votes', []):
+            if 'member' not in vote_entry:
+                continue
+            member_id = voter_id(vote_entry)
+            if member_id not in cache['member']:
+                # Former members only appear in vote records
+                member = vote_entry['member']
+                party_id = get_or_create(connection, cache['party'], 'party', (member.get('party') or 'Unknown',))
+                connection.execute("insert into member (id, full_name, house, party_id) values (?, ?, ?, ?)",
+                                   (member_id, f"{member.get('first_name', '')} {member.get('last_name', '')}".strip(), member.get('house') or division.get('house'), party_id))
+                cache['member'].add(member_id)
+            votes.append((int(division['id']), member_id, 'aye' if vote_entry['vote'] == 'aye' else 'no'))
+        count += 1
+        if len(divisions) >= batch_size:
+            flush()
+    flush()
+    return count
+
+
+def load_suburbs(connection, cache, filename):
+    # Each row links a suburb to its House electorate and to its state's Senate "electorate"
+    count = 0
+    with open(filename, 'r', newline='', encoding='utf-8-sig') as f, connection:
+        for row in csv.DictReader(f):
+            row = {key.strip().lower(): (value or '').strip() for key, value in row.items()}
+            suburb_id = get_or_create(connection, cache['suburb'], 'suburb', (row['suburb'].title(), row['postcode']))
+            electorates = [(row['electorate'], 'representatives')] if row.get('electorate') else []
+            if row.get('state', '').upper() in STATE_ELECTORATES:
+                electorates.append((STATE_ELECTORATES[row['state'].upper()], 'senate'))
+            for electorate in electorates:
+                electorate_id = get_or_create(connection, cache['electorate'], 'electorate', electorate)
+                connection.execute("insert or ignore into electorate_suburb values (?, ?)", (electorate_id, suburb_id))
+            count += 1
+    return count
+
+
+def build_database(database=DEFAULT_DATABASE, store=None, member_filenames=MEMBER_FILENAMES, suburbs_filename=None, batch_size=BATCH_SIZE):
+    # Built into a temporary file and swapped in, so readers never see a partial database
+    store = store or open_store()
+    temporary = database + '.tmp'
+    if os.path.exists(temporary):
+        os.remove(temporary)
+
+    connection = sqlite3.connect(temporary)
+    connection.execute('pragma journal_mode = off')
+    connection.execute('pragma synchronous = off')
+    connection.executescript(SCHEMA)
+
+    cache = {'party': {}, 'electorate': {}, 'suburb': {}, 'member': set()}
+    counts = {'members': load_members(connection, cache, member_filenames)}
+    counts['divisions'] = load_divisions(connection, cache, store, batch_size)
+    counts['suburbs'] = load_suburbs(connection, cache, suburbs_filename) if suburbs_filename else 0
+
+    connection.executescript(INDEXES)
+    connection.execute('analyze')
+    connection.close()
+    os.replace(temporary, database)
+    return counts
+
+
+def dataframe(cursor):
+    import pandas as pd
+    return pd.DataFrame(cursor.fetchall(), columns=[column[0] for column in cursor.description])
+
+
+def compare_members(connection, member_names, division_category, after=None, limit=None):
+    # Pivoted in SQL: one row per division with a vote code column per member (see
+    # scripts/member_comparison.py); `after`/`limit` page through the category by division id
+    import numpy as np
+
+    member_names = list(member_names)
+    if not member_names:
+        return empty_comparison(member_names)
+    code_columns = ', '.join(
+        "coalesce(max(case when member.full_name = ? then (case vote.vote when 'aye' then 1 else -1 end) end), 0)"
+        for _ in member_names
+    )
+    placeholders = ', '.join('?' for _ in member_names)
+    rows = connection.execute(f"""
+        select division.id, division.name, {code_columns}
+        from division
+        join vote on vote.division_id = division.id
+        join member on member.id = vote.member_id
+        where division.division_category = ? and division.id > ? and member.full_name in ({placeholders})
+        group by division.id
+        order by division.id
+        limit ?""", member_names + [division_category, -1 if after is None else int(after)] + member_names + [-1 if limit is None else limit]).fetchall()
+    if not rows:
+        return empty_comparison(member_names)
+    return {
+        'division_ids': np.array([row[0] for row in rows], dtype=np.int64),
+        'division_names': [row[1] for row in rows],
+        'member_names': member_names,
+        'codes': np.array([row[2:] for row in rows], dtype=np.int8),
+    }
+
+
+def members_by_party(connection):
+    members = {}
+    for party, full_name in connection.execute("""
+            select coalesce(party.name, 'Unknown'), member.full_name
+            from member left join party on party.id = member.party_id
+            order by 1, 2"""):
+        members.setdefault(party, []).append(full_name)
+    return members
+
+
+def postcode_key(postcode):
+    # Postcodes are four digits; number inputs drop the leading zero of NT postcodes
+    return f"{int(postcode):04d}"
+
+
+def postcode_members(connection):
+    # Postcode -> ids of every member whose electorate covers a suburb with that postcode
+    index = {}
+    for postcode, member_id in connection.execute("""
+            select distinct suburb.postcode, member_electorate.member_id
+            from suburb
+            join electorate_suburb on electorate_suburb.suburb_id = suburb.id
+            join member_electorate on member_electorate.electorate_id = electorate_suburb.electorate_id
+            order by suburb.postcode, member_electorate.member_id"""):
+        index.setdefault(postcode_key(postcode), []).append(member_id)
+    return {postcode: tuple(member_ids) for postcode, member_ids in index.items()}
+
+
+def member_votes(connection, member_id):
+    # One member's whole voting record, without division summaries
+    cursor = connection.execute("""
+        select member.full_name as member_name, party.name as party, member.house as house,
+               division.name as division_name, vote.vote as vote, division.division_category as category,
+               division.id as division_id
+        from member
+        left join party on party.id = member.party_id
+        join vote on vote.member_id = member.id
+        join division on division.id = vote.division_id
+        where member.id = ?
+        order by division.id""", (member_id,))
+    return dataframe(cursor)
+
+
+def division_summaries(connection, division_ids):
+    division_ids = list(division_ids)
+    placeholders = ', '.join('?' for _ in division_ids) or 'null'
+    return dict(connection.execute(f"select id, summary from division where id in ({placeholders})", division_ids))
+
+
+def division_categories(connection):
+    return [row[0] for row in connection.execute("select distinct division_category from division where division_category is not null order by division_category")]
+
+
+def houses(connection):
+    return [row[0] for row in connection.execute("select distinct house from member order by house")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Build the embedded SQLite mirror of the parliament schema')
+    parser.add_argument('command', choices=['load'])
+    parser.add_argument('--database', default=DEFAULT_DATABASE)
+    parser.add_argument('--suburbs', help='CSV of suburb, postcode, state, electorate')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = build_database(args.database, suburbs_filename=args.suburbs, batch_size=args.batch_size)
+    print(f"Loaded {counts['members']} members, {counts['divisions']} divisions and {counts['suburbs']} suburbs "
+          f"in {time.perf_counter() - started:.1f} s -> {args.database}")
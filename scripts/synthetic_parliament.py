@@ -0,0 +1,237 @@
+import os
+import json
+import random
+import shutil
+import argparse
+from datetime import date, timedelta
+
+from scripts.division_catalog import build_catalog, save_catalog
+from scripts.division_store import DivisionStore
+from scripts.party_breakdowns import build_party_breakdowns, save_party_breakdowns
+from scripts.vote_matrix import VoteMatrix, build_vote_matrix
+
+# Synthetic parliaments at any scale, shaped like They Vote For You data, for benchmarking:
+#
+#   senate.json / house.json   flattened member records, as written by scripts/fetch_members.py
+#   divisions                  division details (votes, summary, bills...) in the division store,
+#                              and optionally as a legacy single-file divisions.json
+#
+# Members get a realistic party mix (including independents and three-part names). Division names
+# cycle through every format scripts/division_categories.py recognises, plus unrecognised ones,
+# and bills recur across several stages. Divisions are generated and written in batches, so the
+# size is bounded by disk rather than memory. Every derived file the app reads is built too.
+#   python -m scripts.synthetic_parliament --divisions 50000 --output /tmp/parliament-50000
+# Run the app (or a benchmark) with that directory as the working directory.
+
+BATCH_SIZE = 2000
+START_DATE = date(2000, 1, 1)
+DIVISIONS_PER_DAY = 6
+ABSENT_RATE = 0.2
+SUMMARY_PARAGRAPHS = 3
+
+# (party, effective party, share of seats)
+PARTY_MIX = {
+    'senate': [
+        ('Australian Labor Party', 'Australian Labor Party', 0.33),
+        ('Liberal Party', 'Liberal National Party', 0.26),
+        ('National Party', 'Liberal National Party', 0.05),
+        ('Country Liberal Party', 'Liberal National Party', 0.02),
+        ('Australian Greens', 'Australian Greens', 0.15),
+        ('Pauline Hanson\'s One Nation Party', 'Pauline Hanson\'s One Nation Party', 0.03),
+        ('Jacqui Lambie Network', 'Jacqui Lambie Network', 0.03),
+        ('United Australia Party', 'United Australia Party', 0.02),
+        ('Independent', 'Independent', 0.04),
+        ('PRES', 'Australian Labor Party', 0.01),
+    ],
+    'representatives': [
+        ('Australian Labor Party', 'Australian Labor Party', 0.50),
+        ('Liberal Party', 'Liberal National Party', 0.28),
+        ('National Party', 'Liberal National Party', 0.08),
+        ('Australian Greens', 'Australian Greens', 0.03),
+        ('Centre Alliance', 'Independent', 0.01),
+        ('Katter\'s Australian Party', 'Independent', 0.01),
+        ('Independent', 'Independent', 0.08),
+        ('SPK', 'Australian Labor Party', 0.01),
+    ],
+}
+SENATE_ELECTORATES = ['NSW', 'Victoria', 'Queensland', 'WA', 'SA', 'Tasmania', 'ACT', 'NT']
+FIRST_NAMES = ['Alex', 'Jordan', 'Sam', 'Taylor', 'Morgan', 'Casey', 'Jamie', 'Riley', 'Avery', 'Quinn',
+               'Charlie', 'Dakota', 'Emerson', 'Finley', 'Harper', 'Kai', 'Logan', 'Parker', 'Reese', 'Sage']
+LAST_NAMES = ['Smith', 'Nguyen', 'Williams', 'Brown', 'Wilson', 'Taylor', 'Van Manen', 'Nampijinpa Price',
+              'O\'Brien', 'Di Natale', 'McKenzie', 'Hanson-Young', 'Le', 'Chen', 'Singh', 'Murphy']
+
+# Every branch of classify_division: the prefix categories, budget, regulations, statements,
+# bills in each stage style (" - ", " in Committee - ", ";", and no stage), and unrecognised names
+NAME_FORMATS = [
+    "Matters of Urgency - {topic}",
+    "Business - Rearrangement",
+    "Business - {topic}; Order of business",
+    "Documents - {topic}; Order for the production of documents",
+    "Committees - {topic} Committee; Reference",
+    "Motions - {topic}",
+    "Budget - Appropriation Bill (No. {number}) {year}-{next_year} - Second Reading",
+    "Regulations and Determinations - {topic} Rules {year} - Disallow",
+    "Statements — {topic}",
+    "{bill} - Second Reading",
+    "{bill} - Third Reading",
+    "{bill} in Committee - Schedule {number}",
+    "{bill}; Consideration of Senate Message",
+    "{bill}",
+    "Procedure - Suspension of standing orders ({topic})",
+    "Adjournment - {topic}",
+]
+TOPICS = ['Climate Change', 'Housing', 'Energy Prices', 'Aged Care', 'Defence', 'Education', 'Health',
+          'Migration', 'Cost of Living', 'Water Security', 'Digital Identity', 'Small Business']
+
+
+def synthetic_members(house, count, rng, first_id):
+    # Flattened member records, with parties allotted by PARTY_MIX
+    shares = PARTY_MIX[house]
+    seats = [max(1, round(share * count)) for _, _, share in shares]
+    seats[0] += count - sum(seats)
+    parties = [(party, effective) for (party, effective, _), n in zip(shares, seats) for _ in range(n)]
+    rng.shuffle(parties)
+
+    members = []
+    for i, (party, effective_party) in enumerate(parties):
+        votes_possible = rng.randint(200, 2000)
+        members.append({
+            'id': first_id + i,
+            'name': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            'electorate': rng.choice(SENATE_ELECTORATES) if house == 'senate' else f"Division of Synthetic {i + 1}",
+            'house': house,
+            'party': party,
+            'effective_party': effective_party,
+            'rebellions': rng.randint(0, 20),
+            'votes_attended': int(votes_possible * rng.uniform(0.7, 1.0)),
+            'votes_possible': votes_possible,
+            'offices': [],
+        })
+    return members
+
+
+def division_name(rng, bills):
+    name_format = rng.choice(NAME_FORMATS)
+    year = rng.randint(2000, 2024)
+    return name_format.format(
+        topic=rng.choice(TOPICS),
+        number=rng.randint(1, 6),
+        year=year,
+        next_year=str(year + 1)[-2:],
+        bill=rng.choice(bills),
+    )
+
+
+def synthetic_division(division_id, house, members, rng, bills):
+    votes = []
+    for member in members:
+        if rng.random() < ABSENT_RATE:
+            continue
+        first_name, last_name = member['name'].split(' ', 1)
+        votes.append({
+            'vote': rng.choice(['aye', 'no']),
+            'member': {
+                'id': member['id'] + 1000000,  # per-term member id; person id below
+                'person': {'id': member['id']},
+                'first_name': first_name,
+                'last_name': last_name,
+                'electorate': member['electorate'],
+                'house': house,
+                'party': member['party'],
+            },
+        })
+
+    name = division_name(rng, bills)
+    summary = "\n\n".join(f"Synthetic summary paragraph {p + 1} for division {division_id}: {name}. " * 4 for p in range(SUMMARY_PARAGRAPHS))
+    return {
+        'id': division_id,
+        'house': house,
+        'name': name,
+        'date': (START_DATE + timedelta(days=division_id // DIVISIONS_PER_DAY)).isoformat(),
+        'number': division_id,
+        'clock_time': None,
+        'aye_votes': sum(1 for vote in votes if vote['vote'] == 'aye'),
+        'no_votes': sum(1 for vote in votes if vote['vote'] == 'no'),
+        'possible_turnout': len(members),
+        'rebellions': 0,
+        'edited': False,
+        'summary': summary,
+        'votes': votes,
+        'bills': [],
+        'policy_divisions': [],
+    }
+
+
+def iter_synthetic_divisions(count, members_by_house, seed=0):
+    # A stream of divisions; each bill recurs across a handful of stages
+    rng = random.Random(seed)
+    houses = sorted(members_by_house)
+    bills = [f"Bills — {rng.choice(TOPICS)} Amendment ({rng.choice(TOPICS)}) Bill {rng.randint(2000, 2024)}" for _ in range(max(1, count // 6))]
+    for division_id in range(1, count + 1):
+        house = houses[rng.random() < 0.5] if len(houses) > 1 else houses[0]
+        yield synthetic_division(division_id, house, members_by_house[house], rng, bills)
+
+
+def batches(iterable, size=BATCH_SIZE):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write_dataset(root, divisions, senators=76, representatives=151, seed=0, legacy_json=False, static_directory='./static'):
+    # Everything under root/data/parliament, plus the app's static files so it renders unchanged
+    directory = os.path.join(root, 'data', 'parliament')
+    os.makedirs(directory, exist_ok=True)
+    if static_directory and os.path.exists(static_directory):
+        shutil.copytree(static_directory, os.path.join(root, 'static'), dirs_exist_ok=True)
+
+    rng = random.Random(seed)
+    members_by_house = {
+        'senate': synthetic_members('senate', senators, rng, 10000),
+        'representatives': synthetic_members('representatives', representatives, rng, 20000),
+    }
+    member_filenames = [os.path.join(directory, 'senate.json'), os.path.join(directory, 'house.json')]
+    for filename, members in zip(member_filenames, members_by_house.values()):
+        with open(filename, 'w') as f:
+            json.dump(members, f, indent=4)
+
+    store = DivisionStore(os.path.join(directory, 'divisions'))
+    legacy = open(os.path.join(directory, 'divisions.json'), 'w', encoding='utf-8') if legacy_json else None
+    try:
+        if legacy:
+            legacy.write('{')
+        for number, batch in enumerate(batches(iter_synthetic_divisions(divisions, members_by_house, seed))):
+            store.append(batch)
+            if legacy:
+                # The old format: one JSON object keyed by division id, written incrementally
+                legacy.write(('' if number == 0 else ', ') + ', '.join(f'"{d["id"]}": {json.dumps(d, ensure_ascii=False)}' for d in batch))
+        if legacy:
+            legacy.write('}')
+    finally:
+        if legacy:
+            legacy.close()
+
+    # The derived files the scheduled workflow would build
+    save_catalog(store, build_catalog(store))
+    vote_matrix = VoteMatrix(build_vote_matrix(store, member_filenames))
+    save_party_breakdowns(build_party_breakdowns(vote_matrix, members_by_house), os.path.join(directory, 'party_breakdowns.matrix'))
+    return {'divisions': divisions, 'members': senators + representatives}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Write a synthetic parliament dataset for benchmarking')
+    parser.add_argument('--divisions', type=int, default=1000)
+    parser.add_argument('--senators', type=int, default=76)
+    parser.add_argument('--representatives', type=int, default=151)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--legacy-json', action='store_true', help='also write a single-file divisions.json')
+    parser.add_argument('--output', required=True, help='directory to create data/parliament in')
+    args = parser.parse_args()
+
+    summary = write_dataset(args.output, args.divisions, args.senators, args.representatives, args.seed, args.legacy_json)
+    print(f"Wrote {summary['divisions']} divisions for {summary['members']} members -> {args.output}")
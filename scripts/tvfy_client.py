@@ -0,0 +1,160 @@
+import os
+import json
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Point TVFY_BASE_URL at a local stand-in server (see scripts/mock_tvfy_server.py) to run offline
+DEFAULT_BASE_URL = 'https://theyvoteforyou.org.au/api/v1'
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_RETRIES = 5
+DEFAULT_BACKOFF = 0.5
+DEFAULT_TIMEOUT = 30
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def base_url():
+    return os.getenv('TVFY_BASE_URL', DEFAULT_BASE_URL).rstrip('/')
+
+
+def create_session(max_workers=DEFAULT_MAX_WORKERS, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    # One keep-alive session shared by every worker, with a connection pool sized to the worker count.
+    # Rate limiting (429) and server errors are retried with exponential backoff, honouring Retry-After.
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET']),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_json(session, path, api_key, params=None, headers=None):
+    # Returns the raw response so callers can inspect the status (and conditional request headers)
+    query = dict(params or {})
+    query['key'] = api_key
+    return session.get(f"{base_url()}/{path.lstrip('/')}", params=query, headers=headers, timeout=DEFAULT_TIMEOUT)
+
+
+class ProgressReport:
+    # Thread-safe progress/throughput counter printed while a batch of requests is in flight
+    def __init__(self, label, total, every=10, stream=None):
+        self.label = label
+        self.total = total
+        self.every = every
+        self.stream = stream or sys.stdout
+        self.completed = 0
+        self.failed = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def update(self, ok, size=0):
+        with self._lock:
+            self.completed += 1
+            if not ok:
+                self.failed += 1
+            self.bytes += size
+            if self.completed % self.every == 0 and self.completed < self.total:
+                self._print()
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def _print(self):
+        elapsed = self.elapsed()
+        rate = self.completed / elapsed if elapsed else 0.0
+        print(f"{self.label}: {self.completed}/{self.total} done, {self.failed} failed, {rate:.1f} req/s", file=self.stream)
+
+    def finish(self):
+        elapsed = self.elapsed()
+        rate = self.completed / elapsed if elapsed else 0.0
+        print(
+            f"{self.label}: {self.completed}/{self.total} done, {self.failed} failed "
+            f"in {elapsed:.2f}s ({rate:.1f} req/s, {self.bytes / 1024:.0f} KiB)",
+            file=self.stream,
+        )
+
+
+def fetch_many(items, fetch_one, max_workers=DEFAULT_MAX_WORKERS, label='requests'):
+    # Run fetch_one(item) across a bounded thread pool. fetch_one returns (result, size) with
+    # result None on failure. Results come back as {item: result} for the successful items.
+    items = list(items)
+    report = ProgressReport(label, len(items))
+    results = {}
+
+    if not items:
+        return results, report
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fetch_one, item): item for item in items}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                result, size = future.result()
+            except requests.RequestException as e:
+                print(f"{label}: {item} failed: {e}", file=report.stream)
+                result, size = None, 0
+
+            if result is not None:
+                results[item] = result
+            report.update(result is not None, size)
+
+    report.finish()
+    return results, report
+
+
+class ConditionalCache:
+    # On-disk cache of response bodies with their ETag/Last-Modified validators, one file per key,
+    # so a refresh can send conditional requests and only download records that changed
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, key):
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except ValueError:
+            return None  # a torn write; treat as uncached
+
+    def headers(self, entry):
+        # Validators to send for a previously loaded entry
+        if entry is None:
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def save(self, key, response):
+        entry = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'body': response.json(),
+        }
+        temporary = self.path(key) + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(temporary, self.path(key))
+        return entry['body']
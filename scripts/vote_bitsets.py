@@ -0,0 +1,218 @@
+import os
+import time
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+from scripts.matrix_file import MatrixFile, write_matrix_file
+from scripts.vote_matrix import AYE, NO, load_vote_matrix
+
+# Every member's votes packed into bitsets over all divisions, for ad-hoc "how often did these
+# members vote together?" questions about any subset of members without recomputing the N x N
+# interaction matrix:
+#
+#   ayes[m, w]   uint64, bit d % 64 of word d // 64 set when member m voted aye in division d
+#   noes[m, w]   the same for no votes; present = ayes | noes
+#
+# Divisions are the vote matrix's columns (date then id order), so filters (house, date range,
+# category) become packed masks too. Unanimity and split divisions are AND/OR reductions over the
+# subset's words followed by a popcount; numpy < 2 has no bitwise_count, so popcounts fall back to
+# the SWAR bit trick on whole words (about twice as fast here as a 256-entry byte lookup table).
+# Pairwise agreement unpacks just the subset's bits for float32 matrix products: BLAS beats k * k
+# popcounts in numpy for every subset size.
+#
+#   data/parliament/vote_bitsets.matrix   (scripts/matrix_file.py)
+#
+# Build after the vote matrix: python -m scripts.vote_bitsets build
+# Ask about a subset:          python -m scripts.vote_bitsets query 10001 10002 10003 --category Bills
+
+DEFAULT_FILENAME = './data/parliament/vote_bitsets.matrix'
+WORD_BITS = 64
+M1, M2, M4, H01 = (np.uint64(0x5555555555555555), np.uint64(0x3333333333333333),
+                   np.uint64(0x0f0f0f0f0f0f0f0f), np.uint64(0x0101010101010101))
+DIVISION_ARRAYS = ['division_ids', 'division_dates', 'division_houses', 'division_categories']
+
+
+def pack_bits(bits):
+    # bool [..., D] -> uint64 [..., ceil(D / 64)]
+    bits = np.asarray(bits, dtype=bool)
+    words = -(-bits.shape[-1] // WORD_BITS)
+    packed = np.packbits(bits, axis=-1, bitorder='little')
+    padded = np.zeros(bits.shape[:-1] + (words * 8,), dtype=np.uint8)
+    padded[..., :packed.shape[-1]] = packed
+    return padded.view('<u8')
+
+
+def unpack_bits(words, count):
+    # uint64 [..., W] -> bool [..., count]
+    return np.unpackbits(np.ascontiguousarray(words).view(np.uint8), axis=-1, count=count, bitorder='little').astype(bool)
+
+
+def popcount_words(words):
+    # Bits set in each uint64 word
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words)
+    words = words - ((words >> np.uint64(1)) & M1)
+    words = (words & M2) + ((words >> np.uint64(2)) & M2)
+    words = (words + (words >> np.uint64(4))) & M4
+    return (words * H01) >> np.uint64(56)
+
+
+def popcount(words):
+    # Bits set along the last axis
+    return popcount_words(np.asarray(words, dtype=np.uint64)).sum(axis=-1, dtype=np.int64)
+
+
+def build_vote_bitsets(vote_matrix):
+    votes = np.asarray(vote_matrix.votes)
+    arrays = {
+        'member_ids': vote_matrix.member_ids,
+        'ayes': pack_bits(votes == AYE),
+        'noes': pack_bits(votes == NO),
+    }
+    arrays.update({name: getattr(vote_matrix, name) for name in DIVISION_ARRAYS})
+    arrays['metadata'] = {
+        'members': int(votes.shape[0]),
+        'divisions': int(votes.shape[1]),
+        'store_seq': vote_matrix.metadata.get('store_seq', -1),
+        'built_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    return arrays
+
+
+def save_vote_bitsets(bitsets, filename=DEFAULT_FILENAME):
+    arrays = {name: array for name, array in bitsets.items() if name != 'metadata'}
+    write_matrix_file(filename, arrays, bitsets['metadata'])
+
+
+def bitsets_signature(filename=DEFAULT_FILENAME):
+    if not os.path.exists(filename):
+        return None
+    stat = os.stat(filename)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+class VoteBitsets:
+    # Read-only queries over a subset of members, optionally restricted to a packed division mask
+    def __init__(self, arrays, metadata=None):
+        self.metadata = metadata if metadata is not None else arrays.get('metadata', {})
+        self.member_ids = np.asarray(arrays['member_ids'])
+        self.ayes = arrays['ayes']
+        self.noes = arrays['noes']
+        for name in DIVISION_ARRAYS:
+            setattr(self, name, np.asarray(arrays[name]))
+
+    @classmethod
+    def open(cls, filename=DEFAULT_FILENAME):
+        matrix_file = MatrixFile(filename)
+        return cls({name: matrix_file[name] for name in matrix_file.names()}, matrix_file.metadata)
+
+    def member_indices(self, member_ids):
+        member_ids = np.asarray(member_ids, dtype=np.int64)
+        indices = np.searchsorted(self.member_ids, member_ids)
+        missing = (indices == len(self.member_ids)) | (self.member_ids[np.minimum(indices, len(self.member_ids) - 1)] != member_ids)
+        if missing.any():
+            raise KeyError(member_ids[missing].tolist())
+        return indices
+
+    def division_mask(self, house=None, start_date=None, end_date=None, category=None):
+        # The same filters as VoteMatrix.division_mask, packed; None means every division
+        if house is None and start_date is None and end_date is None and category is None:
+            return None
+        mask = np.ones(len(self.division_ids), dtype=bool)
+        if house is not None:
+            mask &= self.division_houses == house
+        if category is not None:
+            mask &= self.division_categories == category
+        if start_date is not None:
+            mask &= self.division_dates >= np.datetime64(start_date, 'D')
+        if end_date is not None:
+            mask &= self.division_dates <= np.datetime64(end_date, 'D')
+        return pack_bits(mask)
+
+    def subset(self, member_ids, mask=None):
+        # The subset's (ayes, noes) words, with divisions outside the mask cleared
+        indices = self.member_indices(member_ids)
+        ayes, noes = np.asarray(self.ayes[indices]), np.asarray(self.noes[indices])
+        if mask is not None:
+            ayes, noes = ayes & mask, noes & mask
+        return ayes, noes
+
+    def pairwise_agreement(self, member_ids, mask=None):
+        # (agreement, co_attendance) [k x k], counted as in scripts/interaction_matrix.py
+        ayes, noes = self.subset(member_ids, mask)
+        ayes = unpack_bits(ayes, len(self.division_ids)).astype(np.float32)
+        noes = unpack_bits(noes, len(self.division_ids)).astype(np.float32)
+        present = ayes + noes
+        return (ayes @ ayes.T + noes @ noes.T).astype(np.int64), (present @ present.T).astype(np.int64)
+
+    def unanimity(self, member_ids, mask=None):
+        # Divisions where every member of the subset voted, and voted the same way
+        ayes, noes = self.subset(member_ids, mask)
+        all_aye = np.bitwise_and.reduce(ayes, axis=0)
+        all_no = np.bitwise_and.reduce(noes, axis=0)
+        all_present = np.bitwise_and.reduce(ayes | noes, axis=0)
+        return {
+            'all_present': int(popcount(all_present)),
+            'unanimous': int(popcount(all_aye | all_no)),
+            'unanimous_aye': int(popcount(all_aye)),
+            'unanimous_no': int(popcount(all_no)),
+        }
+
+    def split_words(self, member_ids, mask=None):
+        # Divisions where at least one member of the subset voted aye and another no
+        ayes, noes = self.subset(member_ids, mask)
+        return np.bitwise_or.reduce(ayes, axis=0) & np.bitwise_or.reduce(noes, axis=0)
+
+    def split_divisions(self, member_ids, mask=None):
+        split = unpack_bits(self.split_words(member_ids, mask), len(self.division_ids))
+        return self.division_ids[split]
+
+
+def load_vote_bitsets(filename=DEFAULT_FILENAME):
+    if not os.path.exists(filename):
+        return None
+    return VoteBitsets.open(filename)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Pack every member\'s votes into bitsets and query agreement within a subset')
+    parser.add_argument('command', choices=['build', 'query'])
+    parser.add_argument('member_ids', type=int, nargs='*', help='members to compare (query)')
+    parser.add_argument('--filename', default=DEFAULT_FILENAME)
+    parser.add_argument('--house')
+    parser.add_argument('--start-date')
+    parser.add_argument('--end-date')
+    parser.add_argument('--category')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        vote_matrix = load_vote_matrix()
+        if vote_matrix is None:
+            raise SystemExit("No vote matrix found; run python -m scripts.vote_matrix build first")
+        bitsets = build_vote_bitsets(vote_matrix)
+        save_vote_bitsets(bitsets, args.filename)
+        print(f"Vote bitsets: {bitsets['metadata']['members']} members x {bitsets['ayes'].shape[1]} words "
+              f"({bitsets['metadata']['divisions']} divisions) -> {args.filename}")
+    else:
+        bitsets = load_vote_bitsets(args.filename)
+        if bitsets is None:
+            raise SystemExit("No vote bitsets found; run python -m scripts.vote_bitsets build first")
+        if len(args.member_ids) < 2:
+            raise SystemExit("Give at least two member ids to compare")
+
+        started = time.perf_counter()
+        mask = bitsets.division_mask(args.house, args.start_date, args.end_date, args.category)
+        agreement, co_attendance = bitsets.pairwise_agreement(args.member_ids, mask)
+        unanimity = bitsets.unanimity(args.member_ids, mask)
+        split = bitsets.split_divisions(args.member_ids, mask)
+        elapsed = time.perf_counter() - started
+
+        for i, first in enumerate(args.member_ids):
+            for j, second in enumerate(args.member_ids[i + 1:], start=i + 1):
+                rate = agreement[i, j] / co_attendance[i, j] if co_attendance[i, j] else 0.0
+                print(f"{first} / {second}: agreed in {agreement[i, j]} of {co_attendance[i, j]} divisions ({rate:.0%})")
+        print(f"All present in {unanimity['all_present']} divisions, unanimous in {unanimity['unanimous']} "
+              f"({unanimity['unanimous_aye']} aye, {unanimity['unanimous_no']} no), split in {len(split)}")
+        print(f"({elapsed * 1000:.1f} ms)")
@@ -0,0 +1,20 @@
+import pandas as pd
+
+# Party x vote tallies for one division, computed once and shared by every chart that shows it.
+# Rows are effective parties (sorted), columns are VOTE_TYPES.
+
+VOTE_TYPES = ['Yes', 'No', 'Absent']
+
+# The "required Yes votes to pass" line drawn on every breakdown chart
+REQUIRED_YES_VOTES = 39
+
+
+def aggregate_votes(individual_votes):
+    # individual_votes is the per-member table from scripts.members.division_vote_table
+    if individual_votes.empty:
+        return pd.DataFrame(0, index=pd.Index([], name='Effective Party'), columns=VOTE_TYPES)
+
+    counts = pd.crosstab(individual_votes['Effective Party'], individual_votes['Vote'])
+    counts = counts.reindex(columns=VOTE_TYPES, fill_value=0)
+    counts.columns.name = None
+    return counts
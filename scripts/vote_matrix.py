@@ -0,0 +1,200 @@
+import os
+import json
+import shutil
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+from scripts.division_categories import division_category
+from scripts.division_store import open_store
+
+# A columnar copy of every vote in the division store: one int8 row per member, one column per
+# division, saved as plain .npy files so they can be memory-mapped instead of parsed.
+#
+#   data/parliament/vote_matrix/votes.npy            int8 [members x divisions]
+#   data/parliament/vote_matrix/member_ids.npy       int64, sorted (person ids)
+#   data/parliament/vote_matrix/member_houses.npy    house of each member row
+#   data/parliament/vote_matrix/division_ids.npy     int64, columns ordered by date then id
+#   data/parliament/vote_matrix/division_dates.npy   datetime64[D]
+#   data/parliament/vote_matrix/division_houses.npy
+#   data/parliament/vote_matrix/division_seqs.npy    store sequence number of each column
+#   data/parliament/vote_matrix/division_categories.npy
+#   data/parliament/vote_matrix/metadata.json
+#
+# Build it after each refresh with: python -m scripts.vote_matrix build
+
+DEFAULT_DIRECTORY = './data/parliament/vote_matrix'
+MEMBER_FILENAMES = ['./data/parliament/senate.json', './data/parliament/house.json']
+
+ABSENT = 0
+AYE = 1
+NO = -1
+ARRAYS = ['votes', 'member_ids', 'member_houses', 'division_ids', 'division_dates', 'division_houses', 'division_seqs', 'division_categories']
+
+
+def voter_id(vote_entry):
+    # The person id, which is what senate.json/house.json are keyed by. Vote records carry a
+    # per-term member id as well; fall back to it only for records without a person.
+    member = vote_entry['member']
+    person = member.get('person') or {}
+    return int(person.get('id', member['id']))
+
+
+def vote_code(vote_entry):
+    # Anything other than an aye counts as a no, as it always has in the app
+    return AYE if vote_entry['vote'] == 'aye' else NO
+
+
+def load_member_houses(filenames=MEMBER_FILENAMES):
+    houses = {}
+    for filename in filenames:
+        if os.path.exists(filename):
+            with open(filename, 'r') as f:
+                for member in json.load(f):
+                    houses[int(member['id'])] = member['house']
+    return houses
+
+
+def build_vote_matrix(store=None, member_filenames=MEMBER_FILENAMES):
+    store = store or open_store()
+    index = store.read_index()
+    member_houses = load_member_houses(member_filenames)
+
+    # One pass over the store, keeping only (voter, division column, code) triples
+    divisions = []
+    voters, columns, codes = [], [], []
+    for column, division in enumerate(store.iter_divisions(index)):
+        divisions.append((
+            division.get('date') or '',
+            int(division['id']),
+            division.get('house'),
+            index[int(division['id'])]['seq'],
+            division_category(division.get('name')),
+        ))
+        for vote_entry in division.get('votes', []):
+            member_id = voter_id(vote_entry)
+            voters.append(member_id)
+            columns.append(column)
+            codes.append(vote_code(vote_entry))
+            member_houses.setdefault(member_id, vote_entry['member'].get('house'))
+
+    member_ids = np.array(sorted(member_houses), dtype=np.int64)
+
+    # Order columns chronologically so date ranges are contiguous slices
+    order = sorted(range(len(divisions)), key=lambda i: divisions[i][:2])
+    position = np.empty(len(divisions), dtype=np.int64)
+    position[order] = np.arange(len(divisions))
+
+    votes = np.zeros((len(member_ids), len(divisions)), dtype=np.int8)
+    if voters:
+        rows = np.searchsorted(member_ids, np.array(voters, dtype=np.int64))
+        votes[rows, position[np.array(columns, dtype=np.int64)]] = np.array(codes, dtype=np.int8)
+
+    ordered = [divisions[i] for i in order]
+    return {
+        'votes': votes,
+        'member_ids': member_ids,
+        'member_houses': np.array([member_houses[m] or '' for m in member_ids.tolist()], dtype=str),
+        'division_ids': np.array([d[1] for d in ordered], dtype=np.int64),
+        'division_dates': np.array([d[0] or 'NaT' for d in ordered], dtype='datetime64[D]'),
+        'division_houses': np.array([d[2] or '' for d in ordered], dtype=str),
+        'division_seqs': np.array([d[3] for d in ordered], dtype=np.int64),
+        'division_categories': np.array([d[4] for d in ordered], dtype=str),
+    }
+
+
+def save_vote_matrix(arrays, directory=DEFAULT_DIRECTORY):
+    # Write into a sibling directory and swap it in, so readers never see a half-written matrix
+    temporary = directory.rstrip('/') + '.tmp'
+    shutil.rmtree(temporary, ignore_errors=True)
+    os.makedirs(temporary)
+
+    for name in ARRAYS:
+        np.save(os.path.join(temporary, f"{name}.npy"), arrays[name])
+
+    metadata = {
+        'built_at': datetime.now().isoformat(timespec='seconds'),
+        'store_seq': int(arrays['division_seqs'].max()) if len(arrays['division_seqs']) else -1,
+        'members': int(arrays['votes'].shape[0]),
+        'divisions': int(arrays['votes'].shape[1]),
+        'codes': {'absent': ABSENT, 'aye': AYE, 'no': NO},
+    }
+    with open(os.path.join(temporary, 'metadata.json'), 'w') as f:
+        json.dump(metadata, f)
+
+    previous = directory.rstrip('/') + '.old'
+    if os.path.exists(directory):
+        os.replace(directory, previous)
+    os.replace(temporary, directory)
+    shutil.rmtree(previous, ignore_errors=True)
+    return metadata
+
+
+class VoteMatrix:
+    def __init__(self, arrays, metadata=None):
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+        self.metadata = metadata or {}
+        self._division_order = np.argsort(self.division_ids, kind='stable')
+
+    @classmethod
+    def open(cls, directory=DEFAULT_DIRECTORY, mmap_mode='r'):
+        # The vote matrix is memory-mapped; the small index arrays are read straight in
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode if name == 'votes' else None) for name in ARRAYS}
+        with open(os.path.join(directory, 'metadata.json'), 'r') as f:
+            metadata = json.load(f)
+        return cls(arrays, metadata)
+
+    def member_index(self, member_id):
+        i = int(np.searchsorted(self.member_ids, member_id))
+        if i == len(self.member_ids) or self.member_ids[i] != member_id:
+            raise KeyError(member_id)
+        return i
+
+    def division_index(self, division_id):
+        i = int(np.searchsorted(self.division_ids, division_id, sorter=self._division_order))
+        if i == len(self._division_order) or self.division_ids[self._division_order[i]] != division_id:
+            raise KeyError(division_id)
+        return int(self._division_order[i])
+
+    def member_row(self, member_id):
+        # Every vote this member cast, aligned with division_ids
+        return self.votes[self.member_index(member_id)]
+
+    def division_column(self, division_id):
+        # Every member's vote in one division, aligned with member_ids
+        return self.votes[:, self.division_index(division_id)]
+
+    def division_mask(self, house=None, start_date=None, end_date=None, category=None):
+        mask = np.ones(len(self.division_ids), dtype=bool)
+        if house is not None:
+            mask &= self.division_houses == house
+        if category is not None:
+            mask &= self.division_categories == category
+        if start_date is not None:
+            mask &= self.division_dates >= np.datetime64(start_date, 'D')
+        if end_date is not None:
+            mask &= self.division_dates <= np.datetime64(end_date, 'D')
+        return mask
+
+    def member_mask(self, house=None):
+        if house is None:
+            return np.ones(len(self.member_ids), dtype=bool)
+        return self.member_houses == house
+
+
+def load_vote_matrix(directory=DEFAULT_DIRECTORY):
+    if not os.path.exists(os.path.join(directory, 'metadata.json')):
+        return None
+    return VoteMatrix.open(directory)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Build the columnar member x division vote matrix')
+    parser.add_argument('command', choices=['build'])
+    parser.add_argument('--directory', default=DEFAULT_DIRECTORY)
+    args = parser.parse_args()
+
+    metadata = save_vote_matrix(build_vote_matrix(), args.directory)
+    print(f"Vote matrix: {metadata['members']} members x {metadata['divisions']} divisions -> {args.directory}")
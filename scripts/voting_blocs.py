@@ -0,0 +1,285 @@
+import os
+import time
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+from scripts.division_store import open_store
+from scripts.interaction_matrix import DEFAULT_DIRECTORY as INTERACTION_DIRECTORY
+from scripts.interaction_matrix import HOUSES, InteractionMatrix, interaction_filename
+from scripts.matrix_file import MatrixFile, write_matrix_file
+from scripts.members import load_members
+from scripts.vote_matrix import voter_id
+
+# Analytics over a house's agreement matrix (scripts/interaction_matrix.py):
+#
+#   top_k_similar   the k members who vote most like one member: one matrix row and an
+#                   argpartition, so it runs per request
+#   voting blocs    spectral clustering of the agreement matrix, computed in a batch step and
+#                   saved per house with the version of the matrix it was computed from
+#
+# Blocs are found by embedding members with the leading eigenvectors of the normalised affinity
+# D^-1/2 A D^-1/2, choosing the number of blocs at the largest eigengap (unless given) and running
+# k-means (k-means++ starts, fixed seed) on the unit-length embedding rows. Any two members agree
+# on a good share of divisions, and that background swamps the blocs, so the affinity is agreement
+# above the median pair's, clipped at zero. Pairs that sat together in fewer than MIN_CO_ATTENDANCE
+# divisions don't count; members left with no affinity at all (crossbenchers agreeing with nobody
+# more than usual, members who never voted) get bloc -1, unaligned.
+#
+#   data/parliament/voting_blocs/<house>.matrix   (scripts/matrix_file.py)
+#
+# Build after the interaction matrices: python -m scripts.voting_blocs build
+# The Senate falls back to the converted notebook matrix (senate_legacy.matrix) until a current
+# one has been built. That matrix is keyed by per-term member id (metadata id_kind 'member'), not
+# the person id senate.json uses, so member_directory maps its ids through the stored vote
+# records, which carry both.
+
+DEFAULT_DIRECTORY = './data/parliament/voting_blocs'
+LEGACY_FILENAMES = {'senate': os.path.join(INTERACTION_DIRECTORY, 'senate_legacy.matrix')}
+DEFAULT_TOP_K = 5
+MIN_CO_ATTENDANCE = 10
+MAX_BLOCS = 8
+KMEANS_RESTARTS = 10
+KMEANS_ITERATIONS = 100
+SEED = 0
+
+
+def agreement_filename(house, directory=INTERACTION_DIRECTORY):
+    filename = interaction_filename(house, directory)
+    if not os.path.exists(filename) and house in LEGACY_FILENAMES:
+        return LEGACY_FILENAMES[house]
+    return filename
+
+
+def load_agreement(house, directory=INTERACTION_DIRECTORY):
+    filename = agreement_filename(house, directory)
+    if not os.path.exists(filename):
+        return None
+    return InteractionMatrix(filename)
+
+
+def agreement_version(matrix):
+    # What the blocs were computed from; file times change on checkout, so use the metadata
+    return {key: matrix.metadata.get(key) for key in ['house', 'watermark', 'divisions', 'built_at', 'converted_at']}
+
+
+def file_signature(filename):
+    if not os.path.exists(filename):
+        return None
+    stat = os.stat(filename)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def member_person_ids(member_ids, store=None):
+    # {member id: person id} from the vote records, newest division first, stopping once every id is found
+    store = store or open_store()
+    wanted = {int(member_id) for member_id in member_ids}
+    person_ids = {}
+    if not store.exists():
+        return person_ids
+
+    newest_first = dict(reversed(store.read_index().items()))
+    for division in store.iter_divisions(newest_first):
+        for vote_entry in division.get('votes', []):
+            member = vote_entry.get('member') or {}
+            if member.get('id') in wanted and member.get('person'):
+                person_ids[int(member['id'])] = voter_id(vote_entry)
+        if len(person_ids) == len(wanted):
+            break
+    return person_ids
+
+
+def member_directory(house, matrix, store=None):
+    # {id as the matrix stores it: member record}, leaving out ids that can't be matched to a member
+    members = {int(member['id']): member for member in load_members(house) or []}
+    if matrix is None or matrix.metadata.get('id_kind', 'person') == 'person':
+        return members
+    person_ids = member_person_ids(matrix.member_ids.tolist(), store)
+    return {member_id: members[person_id] for member_id, person_id in person_ids.items() if person_id in members}
+
+
+def top_k_similar(matrix, member_id, k=DEFAULT_TOP_K, min_co_attendance=MIN_CO_ATTENDANCE):
+    # [(member_id, rate, co_attendance or None)], most similar first
+    i = matrix.index(member_id)
+    scores = np.array(matrix.row(member_id), dtype=np.float64)
+    scores[i] = -np.inf
+    co_attendance = None
+    if 'co_attendance' in matrix.file:
+        co_attendance = matrix.row(member_id, 'co_attendance')
+        scores[co_attendance < min_co_attendance] = -np.inf
+
+    candidates = np.flatnonzero(np.isfinite(scores))
+    k = min(k, len(candidates))
+    if k == 0:
+        return []
+    top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+    top = top[np.argsort(-scores[top], kind='stable')]
+    return [
+        (int(matrix.member_ids[j]), float(scores[j]), int(co_attendance[j]) if co_attendance is not None else None)
+        for j in top
+    ]
+
+
+def agreement_rates(matrix, min_co_attendance=MIN_CO_ATTENDANCE):
+    # Symmetric rates with the diagonal and too-rarely-shared pairs zeroed
+    rates = np.array(matrix.matrix('rates'), dtype=np.float64)
+    if 'co_attendance' in matrix.file:
+        rates[np.asarray(matrix.matrix('co_attendance')) < min_co_attendance] = 0
+    rates = (rates + rates.T) / 2
+    np.fill_diagonal(rates, 0)
+    return rates
+
+
+def affinity_matrix(rates):
+    observed = rates[rates > 0]
+    if len(observed) == 0:
+        return rates
+    return np.clip(rates - np.median(observed), 0, None)
+
+
+def spectral_embedding(affinity, dimensions):
+    # Leading eigenvectors of the normalised affinity, largest eigenvalue first
+    degree = affinity.sum(axis=1)
+    scale = 1 / np.sqrt(degree)
+    eigenvalues, eigenvectors = np.linalg.eigh(scale[:, None] * affinity * scale[None, :])
+    order = np.argsort(eigenvalues)[::-1][:dimensions]
+    return eigenvalues[order], eigenvectors[:, order]
+
+
+def choose_bloc_count(eigenvalues, max_blocs=MAX_BLOCS):
+    # The number of leading eigenvalues before the largest drop, at least 2
+    gaps = eigenvalues[:max_blocs] - eigenvalues[1:max_blocs + 1]
+    return max(2, int(np.argmax(gaps[1:])) + 2) if len(gaps) > 1 else 2
+
+
+def kmeans(points, k, rng, restarts=KMEANS_RESTARTS, iterations=KMEANS_ITERATIONS):
+    best_labels, best_inertia = None, np.inf
+    for _ in range(restarts):
+        # k-means++ starts
+        centres = [points[rng.integers(len(points))]]
+        for _ in range(1, k):
+            distances = np.min([((points - centre) ** 2).sum(axis=1) for centre in centres], axis=0)
+            centres.append(points[rng.choice(len(points), p=distances / distances.sum())] if distances.sum() else points[rng.integers(len(points))])
+        centres = np.array(centres)
+
+        labels = None
+        for _ in range(iterations):
+            distances = ((points[:, None, :] - centres[None, :, :]) ** 2).sum(axis=2)
+            new_labels = distances.argmin(axis=1)
+            if labels is not None and (new_labels == labels).all():
+                break
+            labels = new_labels
+            for c in range(k):
+                if (labels == c).any():
+                    centres[c] = points[labels == c].mean(axis=0)
+
+        inertia = ((points - centres[labels]) ** 2).sum()
+        if inertia < best_inertia:
+            best_labels, best_inertia = labels, inertia
+    return best_labels
+
+
+def compute_voting_blocs(matrix, blocs=None, min_co_attendance=MIN_CO_ATTENDANCE, seed=SEED):
+    rates = agreement_rates(matrix, min_co_attendance)
+    affinity = affinity_matrix(rates)
+    connected = affinity.sum(axis=1) > 0
+    labels = np.full(len(matrix.member_ids), -1, dtype=np.int16)
+
+    if connected.sum() > 2:
+        eigenvalues, embedding = spectral_embedding(affinity[np.ix_(connected, connected)], MAX_BLOCS + 1)
+        count = min(blocs or choose_bloc_count(eigenvalues), int(connected.sum()))
+        points = embedding[:, :count]
+        points = points / np.maximum(np.linalg.norm(points, axis=1, keepdims=True), 1e-12)
+        found = kmeans(points, count, np.random.default_rng(seed))
+    else:
+        eigenvalues, count, found = np.zeros(0), 0, np.zeros(0, dtype=np.int64)
+
+    # Number blocs by size, largest first
+    sizes = np.bincount(found, minlength=count)
+    rank = np.empty(count, dtype=np.int16)
+    rank[np.argsort(-sizes, kind='stable')] = np.arange(count)
+    labels[connected] = rank[found]
+
+    # Mean agreement rate between members of the same bloc
+    cohesion = np.zeros(count, dtype=np.float32)
+    for bloc in range(count):
+        members = np.flatnonzero(labels == bloc)
+        if len(members) > 1:
+            within = rates[np.ix_(members, members)]
+            cohesion[bloc] = within.sum() / (len(members) * (len(members) - 1))
+
+    return {
+        'member_ids': matrix.member_ids.astype(np.int64),
+        'blocs': labels,
+        'cohesion': cohesion,
+        'eigenvalues': eigenvalues.astype(np.float32),
+        'metadata': {
+            'house': matrix.metadata.get('house'),
+            'blocs': int(count),
+            'method': 'spectral',
+            'min_co_attendance': min_co_attendance,
+            'seed': seed,
+            'source': os.path.basename(matrix.file.filename),
+            'source_version': agreement_version(matrix),
+            'normalization': matrix.metadata.get('normalization'),
+            'id_kind': matrix.metadata.get('id_kind', 'person'),
+            'built_at': datetime.now().isoformat(timespec='seconds'),
+        },
+    }
+
+
+def blocs_filename(house, directory=DEFAULT_DIRECTORY):
+    return os.path.join(directory, f"{house}.matrix")
+
+
+def save_voting_blocs(voting_blocs, filename):
+    arrays = {name: array for name, array in voting_blocs.items() if name != 'metadata'}
+    write_matrix_file(filename, arrays, voting_blocs['metadata'])
+
+
+class VotingBlocs:
+    def __init__(self, filename):
+        matrix_file = MatrixFile(filename)
+        self.metadata = matrix_file.metadata
+        self.member_ids = np.array(matrix_file['member_ids'])
+        self.blocs = np.array(matrix_file['blocs'])
+        self.cohesion = np.array(matrix_file['cohesion'])
+
+    def members(self, bloc):
+        return self.member_ids[self.blocs == bloc]
+
+    def is_current(self, matrix):
+        return matrix is not None and self.metadata.get('source_version') == agreement_version(matrix)
+
+
+def load_voting_blocs(house, directory=DEFAULT_DIRECTORY):
+    filename = blocs_filename(house, directory)
+    if not os.path.exists(filename):
+        return None
+    return VotingBlocs(filename)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Cluster each house\'s agreement matrix into voting blocs')
+    parser.add_argument('command', choices=['build'])
+    parser.add_argument('--house', choices=HOUSES + ['both'], default='both')
+    parser.add_argument('--blocs', type=int, help='number of blocs (default: chosen by eigengap)')
+    parser.add_argument('--min-co-attendance', type=int, default=MIN_CO_ATTENDANCE)
+    parser.add_argument('--directory', default=DEFAULT_DIRECTORY)
+    args = parser.parse_args()
+
+    for house in (HOUSES if args.house == 'both' else [args.house]):
+        matrix = load_agreement(house)
+        if matrix is None:
+            print(f"{house}: no agreement matrix; run python -m scripts.interaction_matrix build first")
+            continue
+        started = time.perf_counter()
+        voting_blocs = compute_voting_blocs(matrix, args.blocs, args.min_co_attendance)
+        elapsed = time.perf_counter() - started
+
+        filename = blocs_filename(house, args.directory)
+        save_voting_blocs(voting_blocs, filename)
+        sizes = np.bincount(voting_blocs['blocs'][voting_blocs['blocs'] >= 0])
+        print(f"{house}: {voting_blocs['metadata']['blocs']} blocs of {', '.join(map(str, sizes))} members "
+              f"from {voting_blocs['metadata']['source']} in {elapsed * 1000:.0f} ms -> {filename}")
@@ -0,0 +1,64 @@
+import json
+
+from scripts.division_store import INDEX_FILENAME, DivisionStore
+
+# Crash recovery and compaction of the append-only division store (scripts/division_store.py)
+
+
+def division(division_id, house='senate'):
+    return {
+        'id': division_id,
+        'date': f"2024-01-{division_id:02d}",
+        'house': house,
+        'name': f"Motions — Motion {division_id}",
+        'votes': [{'vote': 'aye', 'member': {'id': 100000 + division_id, 'person': {'id': 10000 + division_id}}}],
+    }
+
+
+def test_partial_trailing_record_is_trimmed(tmp_path):
+    store = DivisionStore(str(tmp_path))
+    store.append([division(1), division(2)])
+    segment = store.segment_path(store.segments()[-1])
+
+    # An interrupted append: half a record in the segment and half an index line
+    with open(segment, 'ab') as f:
+        f.write(json.dumps(division(3)).encode()[:20])
+    with open(store.index_path, 'ab') as f:
+        f.write(b'{"id": 3, "seq"')
+
+    reopened = DivisionStore(str(tmp_path))
+    assert sorted(reopened.ids()) == [1, 2]
+
+    reopened.append([division(4)])
+    for path in [segment, store.index_path]:
+        with open(path, 'rb') as f:
+            lines = f.read().split(b'\n')
+        assert lines[-1] == b''
+        assert all(json.loads(line) for line in lines[:-1])
+
+    assert sorted(reopened.ids()) == [1, 2, 4]
+    assert reopened.get(4) == division(4)
+    assert [stored['id'] for stored in reopened.iter_divisions()] == [1, 2, 4]
+
+
+def test_compact_keeps_every_division(tmp_path):
+    store = DivisionStore(str(tmp_path))
+    store.append([division(1), division(2), division(3)])
+    store.append([dict(division(2), name='Motions — Motion 2 (edited)')])
+    old_index = store.read_index()
+    old_segments = store.segments()
+
+    assert store.compact() == 3
+
+    index = store.read_index()
+    assert list(index) == list(old_index)
+    assert {division_id: entry['seq'] for division_id, entry in index.items()} == {division_id: entry['seq'] for division_id, entry in old_index.items()}
+    assert not set(old_segments) & set(store.segments())
+    assert all(entry['segment'] in store.segments() for entry in index.values())
+
+    # index.jsonl holds one line per live division, pointing into the new segments
+    with open(tmp_path / INDEX_FILENAME, 'rb') as f:
+        assert len(f.read().splitlines()) == 3
+    assert store.get(1) == division(1)
+    assert store.get(2)['name'] == 'Motions — Motion 2 (edited)'
+    assert store.get(3) == division(3)
@@ -0,0 +1,54 @@
+import json
+import random
+
+import numpy as np
+
+from scripts.division_store import DivisionStore
+from scripts.interaction_matrix import HOUSES, compute_interactions, update_interactions
+from scripts.synthetic_parliament import iter_synthetic_divisions, synthetic_members
+from scripts.vote_matrix import VoteMatrix, build_vote_matrix
+
+# The incremental (rank-k) update of the interaction matrices must match a full rebuild
+
+
+def fresh_interactions(store, member_filenames, house):
+    vote_matrix = VoteMatrix(build_vote_matrix(store, member_filenames), {'store_seq': store.last_seq()})
+    return compute_interactions(vote_matrix, house)
+
+
+def test_update_matches_rebuild(tmp_path):
+    rng = random.Random(0)
+    members_by_house = {
+        'senate': synthetic_members('senate', 20, rng, 10000),
+        'representatives': synthetic_members('representatives', 30, rng, 20000),
+    }
+    member_filenames = []
+    for house, members in members_by_house.items():
+        filename = tmp_path / f"{house}.json"
+        filename.write_text(json.dumps(members))
+        member_filenames.append(str(filename))
+
+    # The later divisions include a senator who isn't in senate.json, so the member axis grows
+    divisions = list(iter_synthetic_divisions(60, members_by_house, seed=1))
+    newcomer = dict(members_by_house['senate'][0], id=19999, name='New Senator')
+    later = [division for division in iter_synthetic_divisions(90, dict(members_by_house, senate=members_by_house['senate'] + [newcomer]), seed=2)
+             if division['id'] > 60]
+
+    store = DivisionStore(str(tmp_path / 'divisions'))
+    store.append(divisions)
+    initial = {house: fresh_interactions(store, member_filenames, house) for house in HOUSES}
+    store.append(later)
+
+    for house in HOUSES:
+        updated, added = update_interactions(initial[house], store)
+        rebuilt = fresh_interactions(store, member_filenames, house)
+
+        assert added == sum(division['house'] == house for division in later)
+        assert np.array_equal(updated['member_ids'], rebuilt['member_ids'])
+        assert sorted(updated['division_ids'].tolist()) == sorted(rebuilt['division_ids'].tolist())
+        for name in ['agreement', 'co_attendance', 'rates']:
+            assert np.array_equal(updated[name], rebuilt[name]), name
+        assert updated['metadata']['divisions'] == rebuilt['metadata']['divisions']
+        assert updated['metadata']['watermark'] == store.last_seq()
+        if house == 'senate':
+            assert 19999 not in initial[house]['member_ids'] and 19999 in updated['member_ids']
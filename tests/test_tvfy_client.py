@@ -0,0 +1,65 @@
+import random
+
+import pytest
+
+from scripts.mock_tvfy_server import build_fixture, start_server
+from scripts.synthetic_parliament import synthetic_members
+from scripts.tvfy_client import create_session, fetch_many, get_json
+
+# Retries of the shared API session against the stand-in server (scripts/mock_tvfy_server.py),
+# which fails the first requests for each path with 429, 503 and 500 in turn
+
+
+@pytest.fixture
+def fixture():
+    return build_fixture(synthetic_members('senate', 12, random.Random(0), 10000), num_divisions=20)
+
+
+@pytest.fixture
+def serve(fixture, monkeypatch):
+    servers = []
+
+    def serve(fail_first):
+        server = start_server(fixture, fail_first=fail_first)
+        monkeypatch.setenv('TVFY_BASE_URL', f"http://127.0.0.1:{server.server_address[1]}/api/v1")
+        servers.append(server)
+        return server
+
+    yield serve
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def fetch_people(session, person_ids):
+    def fetch_one(person_id):
+        response = get_json(session, f'people/{person_id}.json', 'key')
+        if response.status_code != 200:
+            return None, 0
+        return response.json(), len(response.content)
+
+    return fetch_many(person_ids, fetch_one, max_workers=4, label='people')
+
+
+def test_retries_rate_limits_and_server_errors(fixture, serve):
+    server = serve(fail_first=3)
+    person_ids = list(fixture['people'])
+
+    with create_session(max_workers=4, backoff=0) as session:
+        results, report = fetch_people(session, person_ids)
+
+    assert report.failed == 0
+    assert {person_id: person['id'] for person_id, person in results.items()} == {person_id: person_id for person_id in person_ids}
+    # Every person was answered 429, 503 and 500 before the 200
+    assert server.request_count == 4 * len(person_ids)
+
+
+def test_gives_up_after_the_retry_budget(fixture, serve):
+    serve(fail_first=3)
+    person_ids = list(fixture['people'])
+
+    with create_session(max_workers=4, retries=2, backoff=0) as session:
+        results, report = fetch_people(session, person_ids)
+
+    assert results == {}
+    assert report.failed == len(person_ids)